@@ -0,0 +1,63 @@
+"""Cold-start benchmark of the `sporganized` command line.
+
+Each subcommand's script is imported in a fresh interpreter, as the CLI
+does once the subcommand is chosen; the median import time over several
+runs is printed with the heavy dependencies it pulled in. The whole
+`sporganized --help` round trip is timed too.
+
+Usage:
+    python -m benchmarks.bench_cold_start [runs]
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from src.cli import COMMANDS
+
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "spotipy", "requests", "dotenv")
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.cli, {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def time_import(module: str) -> Tuple[float, List[str]]:
+    """Import `module` in a fresh interpreter; return (seconds, heavy modules loaded)."""
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    elapsed, loaded = json.loads(output)
+    return elapsed, loaded
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src.cli", "--help"],
+                       capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    print(f"sporganized --help (process): {statistics.median(timings) * 1000:7.1f} ms")
+
+    for name, command in COMMANDS.items():
+        samples = [time_import(command.module) for _ in range(runs)]
+        median = statistics.median(elapsed for elapsed, _ in samples)
+        loaded = ", ".join(samples[-1][1]) or "-"
+        print(f"sporganized {name:<7} import: {median * 1000:7.1f} ms  (loads: {loaded})")
+
+
+if __name__ == "__main__":
+    main()
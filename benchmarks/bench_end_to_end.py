@@ -0,0 +1,160 @@
+"""End-to-end benchmark of the scripts against the offline fake backend.
+
+For each library size, a `FakeBackend` is started and `sort_by_genres`,
+`sort_by_mood` and `delete_created_playlist` are run in turn, each in its
+own process (so peak memory is per script) and with a fresh cache
+directory per library size. Reported per run: wall time, peak RSS and the
+number of API calls per endpoint.
+
+By default the rate limiters are opened up so the numbers reflect the code
+rather than the providers' quotas; pass `--real-quotas` to keep them.
+
+Usage:
+    python -m benchmarks.bench_end_to_end [--sizes 1000 10000 100000]
+        [--latency 0.02] [--throttle 0.01] [--passes 2] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_backend import FakeBackend
+
+SCRIPTS = ("genres", "moods", "clean")
+RESULT_MARKER = "BENCH_RESULT "
+
+
+# ── Child process: run one script ──────────────────────────────────────────
+def run_script(script: str, backend_url: str, real_quotas: bool) -> Dict[str, Any]:
+    """Run one script against the backend and return its timing and memory."""
+    from src import constants  # pylint: disable=import-outside-toplevel
+
+    if not real_quotas:
+        # Must happen before the provider clients import their rates
+        constants.LASTFM_RATE = constants.DISCOGS_RATE = 1000.0
+
+    # pylint: disable=import-outside-toplevel
+    from benchmarks.fake_backend import fake_spotify_client
+    from scripts import delete_created_playlist, sort_by_genres, sort_by_mood
+
+    sp_client = fake_spotify_client(backend_url, realistic_rate=real_quotas)
+    start = time.perf_counter()
+    if script == "genres":
+        sort_by_genres.main([], sp_client)
+    elif script == "moods":
+        sort_by_mood.main([], sp_client)
+    else:
+        delete_created_playlist.main([], sp_client)
+    wall = time.perf_counter() - start
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "retries": sp_client.retries,
+        "throttled_seconds": round(sp_client.throttled_seconds, 3),
+    }
+
+
+# ── Parent process: drive backend and children ─────────────────────────────
+def run_child(
+    script: str, backend: FakeBackend, cache_dir: str, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Run `script` in a subprocess and collect its result and API calls."""
+    env = dict(
+        os.environ,
+        SPORGANIZED_CACHE_DIR=cache_dir,
+        LASTFM_API_URL=f"{backend.url}/lastfm/",
+        DISCOG_API_URL=f"{backend.url}/discogs/",
+    )
+    command = [sys.executable, "-m", "benchmarks.bench_end_to_end",
+               "--child", script, "--backend", backend.url]
+    if args.real_quotas:
+        command.append("--real-quotas")
+
+    backend.call_counts(reset=True)
+    proc = subprocess.run(command, env=env, capture_output=True, text=True, check=False)
+    if args.verbose or proc.returncode:
+        sys.stdout.write(proc.stdout)
+        sys.stderr.write(proc.stderr)
+    if proc.returncode:
+        raise RuntimeError(f"{script} failed with exit code {proc.returncode}")
+
+    result_line = next(
+        line for line in reversed(proc.stdout.splitlines()) if line.startswith(RESULT_MARKER)
+    )
+    result = json.loads(result_line[len(RESULT_MARKER):])
+    calls = backend.call_counts(reset=True)
+    result["api_calls"] = dict(sorted(calls.items()))
+    result["api_calls_total"] = sum(calls.values())
+    return result
+
+
+def print_run(size: int, run_pass: int, script: str, result: Dict[str, Any]) -> None:
+    """Print one result row followed by its per-endpoint call counts."""
+    print(
+        f"{size:>7} {run_pass:>4} {script:<7} {result['wall_seconds']:>9.2f}s "
+        f"{result['peak_rss_mb']:>8.1f}MB {result['api_calls_total']:>7} calls "
+        f"{result['retries']:>4} retries"
+    )
+    for endpoint, count in result["api_calls"].items():
+        print(f"{'':>22}{count:>7}  {endpoint}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="library sizes to benchmark (default: 1000 10000)")
+    parser.add_argument("--scripts", nargs="+", choices=SCRIPTS, default=list(SCRIPTS))
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every fake API response")
+    parser.add_argument("--throttle", type=float, default=0.0,
+                        help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=0,
+                        help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--passes", type=int, default=1,
+                        help="run the scripts this many times per size (later passes are warm)")
+    parser.add_argument("--real-quotas", action="store_true",
+                        help="keep the production rate limits")
+    parser.add_argument("--output", help="write the full report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="show the scripts' own output")
+    parser.add_argument("--child", choices=SCRIPTS, help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Benchmark entry point."""
+    args = parse_args(argv)
+    if args.child:
+        result = run_script(args.child, args.backend, args.real_quotas)
+        print(RESULT_MARKER + json.dumps(result))
+        return
+
+    report: List[Dict[str, Any]] = []
+    print(f"{'tracks':>7} {'pass':>4} {'script':<7} {'wall':>10} {'peak':>10} {'API':>13}")
+    for size in args.sizes:
+        backend = FakeBackend(size, args.latency, args.throttle, args.retry_after)
+        with backend, tempfile.TemporaryDirectory(prefix="sporganized-bench-") as cache_dir:
+            for run_pass in range(1, args.passes + 1):
+                for script in args.scripts:
+                    result = run_child(script, backend, cache_dir, args)
+                    print_run(size, run_pass, script, result)
+                    report.append({"tracks": size, "pass": run_pass, "script": script, **result})
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Micro-benchmark of genre classification on a synthetic library.
+
+Compares the compiled `GenreClassifier` with the former linear scan over
+`GENRE_GROUPS`, both as it was used (first genre of the first artist only)
+and applied to the same work as the classifier (every genre of every
+artist), and prints the per-track cost of each.
+
+Usage:
+    python -m benchmarks.bench_genre_classifier [n_tracks]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from src.genre_classifier import GenreClassifier, DEFAULT_GROUP
+from src.genre_groups import GENRE_GROUPS
+
+
+def legacy_map_to_group(genre: str) -> str:
+    """The original linear scan, kept here as the baseline."""
+    for group_name, subgenres in GENRE_GROUPS.items():
+        if genre in subgenres:
+            return group_name
+    return DEFAULT_GROUP
+
+
+def synthetic_library(
+    n_tracks: int, n_artists: int, seed: int = 42
+) -> Tuple[List[Tuple[str, List[str]]], Dict[str, List[str]]]:
+    """Return `(tracks, artist_genres)` with a mix of known and unseen genres."""
+    rng = random.Random(seed)
+    known = sorted({g for genres in GENRE_GROUPS.values() for g in genres})
+    unseen = [f"{word} {g}" for word in ("dark", "nordic", "lofi", "xyz") for g in known]
+    vocabulary = known + unseen
+
+    artist_genres = {
+        f"artist{i}": rng.sample(vocabulary, rng.randint(0, 4)) for i in range(n_artists)
+    }
+    artists = list(artist_genres)
+    tracks = [
+        (f"track{i}", rng.sample(artists, rng.choice((1, 1, 1, 2, 3))))
+        for i in range(n_tracks)
+    ]
+    return tracks, artist_genres
+
+
+def main() -> None:
+    """Run the benchmark and print per-track timings."""
+    n_tracks = int(sys.argv[1]) if len(sys.argv) > 1 else 40_000
+    tracks, artist_genres = synthetic_library(n_tracks, max(1, n_tracks // 4))
+
+    start = time.perf_counter()
+    for _, artist_ids in tracks:
+        genres = artist_genres.get(artist_ids[0], [])
+        if genres:
+            legacy_map_to_group(genres[0])
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, artist_ids in tracks:
+        for artist_id in artist_ids:
+            for genre in artist_genres.get(artist_id, []):
+                legacy_map_to_group(genre)
+    legacy_all = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grouped = GenreClassifier().classify_library(tracks, artist_genres)
+    compiled = time.perf_counter() - start
+
+    unresolved = len(grouped.get(DEFAULT_GROUP, []))
+    print(f"Tracks: {n_tracks}")
+    print(f"Linear scan (first genre): {legacy:.3f}s ({legacy / n_tracks * 1e6:.2f} µs/track)")
+    print(
+        f"Linear scan (all genres) : {legacy_all:.3f}s "
+        f"({legacy_all / n_tracks * 1e6:.2f} µs/track)"
+    )
+    print(f"Classifier (all genres)  : {compiled:.3f}s ({compiled / n_tracks * 1e6:.2f} µs/track)")
+    print(f"Tracks left in '{DEFAULT_GROUP}': {unresolved}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Offline stand-in for the Spotify, Last.fm and Discogs web APIs.
+
+`FakeBackend` is a local HTTP server serving a synthetic library of
+configurable size, so the real Spotipy / requests code paths (rate limiter,
+retries, paging) run unchanged against it:
+
+    /spotify/v1/...   Spotify Web API subset used by the scripts
+    /lastfm/          Last.fm `track.gettoptags`
+    /discogs/         Discogs database search
+
+Latency and 429 responses (with `Retry-After`) can be injected, and every
+request is counted per endpoint.
+
+Usage:
+    with FakeBackend(n_tracks=10_000, latency=0.02) as backend:
+        sp_client = fake_spotify_client(backend.url)
+        ...
+        print(backend.call_counts())
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import spotipy
+
+from src.genre_groups import GENRE_GROUPS
+from src.rate_limited_spotify import RateLimitedSpotify
+from src.token_bucket import AdaptiveTokenBucket
+
+USER_ID = "benchuser"
+MARKETS = [f"{a}{b}" for a in "ABCDEFGHIJ" for b in "ABCDEFGHIJ"]  # bulk like real objects
+MOOD_TAGS = (
+    ("chill", "ambient", "downtempo", "relaxing"),
+    ("happy", "pop", "summer", "upbeat"),
+    ("dance", "house", "electronic", "club"),
+    ("energetic", "rock", "metal", "rap"),
+    ("mellow", "sad", "acoustic", "folk"),
+)
+_ID_SEGMENT = re.compile(r"^(playlists|users)/[^/]+")
+
+
+class SyntheticLibrary:
+    """Deterministic synthetic library: tracks, artists, genres and tags.
+
+    Args:
+        n_tracks: Number of liked tracks.
+        n_playlists: Number of pre-existing playlists (a few are `[AUTO]`).
+        seed: Random seed.
+    """
+
+    def __init__(self, n_tracks: int, n_playlists: int = 150, seed: int = 42) -> None:
+        rng = random.Random(seed)
+        known = sorted({g for genres in GENRE_GROUPS.values() for g in genres})
+        vocabulary = known + [f"nordic {g}" for g in known[:40]]
+
+        n_artists = max(10, n_tracks // 5)
+        self.artist_genres = [rng.sample(vocabulary, rng.randint(0, 3)) for _ in range(n_artists)]
+        self.artist_mood = [rng.randrange(len(MOOD_TAGS)) for _ in range(n_artists)]
+
+        self.tracks: List[Tuple[Tuple[int, ...], str]] = []
+        for i in range(n_tracks):
+            artists = (i * 7919 % n_artists,)
+            if rng.random() < 0.2:
+                artists += (rng.randrange(n_artists),)
+            # Every 25th track re-releases the previous recording (same ISRC)
+            isrc = self.tracks[-1][1] if i % 25 == 24 else f"US-S1Z-{i:07d}"
+            self.tracks.append((artists, isrc))
+
+        self.playlists: Dict[str, Dict[str, Any]] = {}
+        for i in range(n_playlists):
+            auto = i % 30 == 0
+            self.playlists[f"pl{i:06d}"] = {
+                "name": f"Old mix {i}",
+                "description": "[AUTO]" if auto else "",
+                "owner": USER_ID if i % 3 else "someoneelse",
+                "tracks": [],
+                "snapshot": 0,
+            }
+
+    @staticmethod
+    def track_id(index: int) -> str:
+        """Spotify-like ID of the track at `index`."""
+        return f"trk{index:08d}"
+
+    @staticmethod
+    def artist_id(index: int) -> str:
+        """Spotify-like ID of the artist at `index`."""
+        return f"art{index:08d}"
+
+    def saved_item(self, index: int) -> Dict[str, Any]:
+        """Full saved-track item, newest first (index 0 is the latest like)."""
+        artists, isrc = self.tracks[index]
+        added = time.gmtime(1_600_000_000 + (len(self.tracks) - index) * 60)
+        return {
+            "added_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", added),
+            "track": {
+                "id": self.track_id(index),
+                "name": f"Track {index}",
+                "artists": [{"id": self.artist_id(a), "name": f"Artist {a}"} for a in artists],
+                "external_ids": {"isrc": isrc},
+                "available_markets": MARKETS,
+                "album": {
+                    "name": f"Album {index // 10}",
+                    "available_markets": MARKETS,
+                    "images": [
+                        {"url": f"https://img.example/{index}/{size}", "height": size}
+                        for size in (64, 300, 640)
+                    ],
+                },
+                "duration_ms": 180_000,
+                "popularity": index % 100,
+            },
+        }
+
+    def lastfm_tags(self, artist_name: str) -> List[Dict[str, Any]]:
+        """Top tags for an artist's tracks, weighted like Last.fm (0-100)."""
+        index = int(artist_name.rsplit(" ", 1)[-1]) if artist_name[-1:].isdigit() else 0
+        tags = MOOD_TAGS[self.artist_mood[index % len(self.artist_mood)]]
+        return [{"name": tag, "count": 100 - 20 * rank} for rank, tag in enumerate(tags)]
+
+
+class FakeBackend:
+    """Local HTTP server emulating the three providers over a synthetic library.
+
+    Args:
+        n_tracks: Size of the synthetic library.
+        latency: Seconds added to every response.
+        throttle_rate: Fraction of requests answered with 429.
+        retry_after: `Retry-After` value (seconds) sent with 429 responses.
+        seed: Random seed for the library and the injected 429s.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        n_tracks: int,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 0,
+        seed: int = 42,
+    ) -> None:
+        self.library = SyntheticLibrary(n_tracks, seed=seed)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._ids = itertools.count()
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────
+    def start(self) -> "FakeBackend":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # ── Stats ──────────────────────────────────────────────────────────────
+    def call_counts(self, reset: bool = False) -> Dict[str, int]:
+        """Requests served per endpoint (429s are counted under `... 429`)."""
+        with self._lock:
+            counts = dict(self._counts)
+            if reset:
+                self._counts.clear()
+        return counts
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _should_throttle(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.throttle_rate
+
+    # ── Routing ────────────────────────────────────────────────────────────
+    def _handler_class(self) -> type:
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Dispatches every request to the backend."""
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # no delayed-ACK stalls on keep-alive
+
+            def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+                pass
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+                status, payload, headers = backend.route(self.command, self.path, body)
+                raw = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        return Handler
+
+    def route(self, method: str, raw_path: str, body: Any) -> Tuple[int, Any, Dict[str, str]]:
+        """Return `(status, json_payload, headers)` for a request."""
+        parsed = urlparse(raw_path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        provider, _, path = parsed.path.strip("/").partition("/")
+        path = path.removeprefix("v1/").strip("/")
+
+        endpoint = f"{provider} {method} /" + _ID_SEGMENT.sub(r"\1/{id}", path)
+        if provider == "lastfm":
+            endpoint = f"lastfm {method} {query.get('method', '')}"
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_throttle():
+            self._count(f"{endpoint} 429")
+            error = {"error": {"status": 429, "message": "API rate limit exceeded"}}
+            return 429, error, {"Retry-After": str(self.retry_after)}
+        self._count(endpoint)
+
+        if provider == "lastfm":
+            tags = self.library.lastfm_tags(query.get("artist", ""))
+            return 200, {"toptags": {"tag": tags}}, {}
+        if provider == "discogs":
+            genres = ["Electronic"] if query.get("artist", "").endswith("0") else ["Rock"]
+            return 200, {"results": [{"genre": genres}]}, {}
+        return self._spotify(method, path, query, body)
+
+    def _page(
+        self, path: str, query: Dict[str, str], items: List[Any], total: int
+    ) -> Dict[str, Any]:
+        offset, limit = int(query.get("offset", 0)), int(query.get("limit", 20))
+        following = offset + limit
+        next_url = None
+        if following < total:
+            params = "&".join(f"{k}={v}" for k, v in {**query, "offset": following}.items())
+            next_url = f"{self.url}/spotify/v1/{path}?{params}"
+        return {"items": items, "total": total, "offset": offset, "limit": limit, "next": next_url}
+
+    def _spotify(  # pylint: disable=too-many-return-statements
+        self, method: str, path: str, query: Dict[str, str], body: Any
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        lib = self.library
+        parts = path.split("/")
+        offset, limit = int(query.get("offset", 0)), int(query.get("limit", 20))
+
+        if path == "me":
+            return 200, {"id": USER_ID, "display_name": "Bench User"}, {}
+        if path == "me/tracks":
+            items = [lib.saved_item(i) for i in range(offset, min(offset + limit, len(lib.tracks)))]
+            return 200, self._page(path, query, items, len(lib.tracks)), {}
+        if path == "artists":
+            ids = query.get("ids", "").split(",")
+            artists = [
+                {"id": aid, "name": f"Artist {int(aid[3:])}",
+                 "genres": lib.artist_genres[int(aid[3:]) % len(lib.artist_genres)]}
+                for aid in ids if aid
+            ]
+            return 200, {"artists": artists}, {}
+        if path == "me/playlists":
+            with self._lock:
+                listing = list(lib.playlists.items())
+            items = [
+                {"id": pid, "name": p["name"], "description": p["description"],
+                 "owner": {"id": p["owner"]}, "snapshot_id": str(p["snapshot"])}
+                for pid, p in listing[offset:offset + limit]
+            ]
+            return 200, self._page(path, query, items, len(listing)), {}
+        if parts[0] == "users" and method == "POST":
+            with self._lock:
+                pid = f"new{next(self._ids):06d}"
+                lib.playlists[pid] = {
+                    "name": body["name"], "description": body.get("description", ""),
+                    "owner": USER_ID, "tracks": [], "snapshot": 0,
+                }
+            return 201, {"id": pid, "name": body["name"], "snapshot_id": "0",
+                         "description": body.get("description", ""), "owner": {"id": USER_ID}}, {}
+        if parts[0] == "playlists" and len(parts) >= 2:
+            return self._playlist(method, parts, query, body)
+        return 404, {"error": {"status": 404, "message": f"Unknown endpoint {path}"}}, {}
+
+    def _playlist(
+        self, method: str, parts: List[str], query: Dict[str, str], body: Any
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            playlist = self.library.playlists.get(parts[1])
+            if playlist is None:
+                return 404, {"error": {"status": 404, "message": "Not found"}}, {}
+            if len(parts) == 2:
+                return 200, {"id": parts[1], "snapshot_id": str(playlist["snapshot"])}, {}
+            if parts[2] == "followers" and method == "DELETE":
+                del self.library.playlists[parts[1]]
+                return 200, None, {}
+            if method == "GET":
+                offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+                items = [{"track": {"id": t}} for t in playlist["tracks"][offset:offset + limit]]
+                path = "/".join(parts)
+                return 200, self._page(path, query, items, len(playlist["tracks"])), {}
+            if method == "POST":
+                playlist["tracks"].extend(uri.rsplit(":", 1)[-1] for uri in body)
+            elif method == "DELETE":
+                if "snapshot_id" in body and body["snapshot_id"] != str(playlist["snapshot"]):
+                    return 400, {"error": {"status": 400, "message": "Stale snapshot"}}, {}
+                gone = {item["uri"].rsplit(":", 1)[-1] for item in body["items"]}
+                playlist["tracks"] = [t for t in playlist["tracks"] if t not in gone]
+            playlist["snapshot"] += 1
+            return 200, {"snapshot_id": str(playlist["snapshot"])}, {}
+
+
+def fake_spotify_client(base_url: str, realistic_rate: bool = False) -> RateLimitedSpotify:
+    """Return a rate-limited Spotipy client pointed at a `FakeBackend`.
+
+    Args:
+        base_url: `FakeBackend.url`.
+        realistic_rate: Keep the production rate limiter settings; by default
+            the limiter is opened up so benchmarks measure the code, not the quota.
+    """
+    client = spotipy.Spotify(auth="offline-token", requests_session=requests.Session())
+    client.prefix = f"{base_url}/spotify/v1/"
+    if realistic_rate:
+        return RateLimitedSpotify(client)
+    return RateLimitedSpotify(client, AdaptiveTokenBucket(1000.0, 1.0, 1000.0))
@@ -1,6 +1,9 @@
 """Delete all Spotify playlists owned by the user that contain “[AUTO]” in
 their description.
 
+Use `--dry-run` to only list them, and `--name` / `--prefix` to restrict
+the cleanup to some playlists.
+
 Environment variables to be set in a `.env` file (handled by python‑dotenv):
     - SPOTIPY_CLIENT_ID
     - SPOTIPY_CLIENT_SECRET
@@ -8,60 +11,127 @@ Environment variables to be set in a `.env` file (handled by python‑dotenv):
 """
 
 from __future__ import annotations
-from typing import Any
-import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+import requests
 import spotipy
+from spotipy.exceptions import SpotifyException
 
 # ── Constants & Functions ────────────────────────────────────────────────────────────────
 from src.authenticate_spotify import authenticate_spotify
-from src.constants import RATE_DELAY, DESCRIPTION_TAG
+from src.rate_limited_spotify import RateLimitedSpotify
+from src.constants import DESCRIPTION_TAG, WRITE_WORKERS
+from src.playlist_index import PlaylistIndex, normalize_name
+from src.run_metrics import instrumented_run
+
+def select_auto_playlists(
+    index: PlaylistIndex,
+    names: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return the tagged playlists of `index` matching the name filters.
+
+    Names and prefix are compared case- and whitespace-insensitively; with
+    no filter, every tagged playlist is selected.
+    """
+    wanted = {normalize_name(name) for name in names} if names else None
+    start = normalize_name(prefix) if prefix else ""
+    return [
+        playlist
+        for playlist in index.tagged()
+        if (wanted is None or normalize_name(playlist["name"]) in wanted)
+        and normalize_name(playlist["name"]).startswith(start)
+    ]
 
-def delete_auto_playlists(sp_client: spotipy.Spotify, description_tag: str) -> int:
+
+def delete_auto_playlists(  # pylint: disable=too-many-arguments
+    sp_client: spotipy.Spotify,
+    description_tag: str,
+    *,
+    names: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+    dry_run: bool = False,
+    workers: int = WRITE_WORKERS,
+) -> int:
     """Delete every playlist *owned by the user* that contains `description_tag`.
 
+    The user's playlists are listed once into a `PlaylistIndex` and the
+    matching IDs are collected before anything is deleted, so deleting does
+    not disturb the listing. Playlists are then unfollowed concurrently; the
+    client's rate limiter keeps the calls within Spotify's budget. A failed
+    deletion is reported and does not stop the others.
+
     Args:
         sp_client: Authenticated Spotipy client.
         description_tag: The marker text to search for in playlist descriptions.
+        names: Only delete playlists with one of these names.
+        prefix: Only delete playlists whose name starts with this prefix.
+        dry_run: List the playlists that would be deleted without deleting them.
+        workers: Number of concurrent unfollow calls.
 
     Returns:
-        The total number of playlists deleted.
+        The total number of playlists deleted (or that would be, on a dry run).
     """
-    user_id: str = sp_client.me()["id"]
-    deleted_total = 0
+    index = PlaylistIndex(sp_client, description_tag)
+    selected = select_auto_playlists(index, names, prefix)
+    if dry_run:
+        for playlist in selected:
+            print(f"Would delete playlist: {playlist['name']}")
+        return len(selected)
 
-    while True:
-        deleted_this_round = 0
-        playlists: dict[str, Any] = sp_client.current_user_playlists(limit=50)
-
-        while playlists:
-            for playlist in playlists["items"]:
-                is_owner = playlist["owner"]["id"] == user_id
-                has_tag = description_tag in (playlist.get("description") or "")
+    deleted_total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(sp_client.current_user_unfollow_playlist, playlist["id"]): playlist
+            for playlist in selected
+        }
+        for future in as_completed(futures):
+            playlist = futures[future]
+            try:
+                future.result()
+            except (SpotifyException, requests.RequestException) as exc:
+                print(f"Could not delete playlist {playlist['name']}: {exc}")
+                continue
+            print(f"Deleted playlist: {playlist['name']}")
+            index.forget(playlist["id"])
+            deleted_total += 1
 
-                if is_owner and has_tag:
-                    name = playlist["name"]
-                    print(f"Deleting playlist: {name}")
-                    sp_client.current_user_unfollow_playlist(playlist["id"])
-                    deleted_total += 1
-                    deleted_this_round += 1
-                    time.sleep(RATE_DELAY)
+    return deleted_total
 
-            playlists = sp_client.next(playlists) if playlists["next"] else None
 
-        if deleted_this_round == 0:
-            break  # no more matches, exit outer loop
+def main(argv: Optional[List[str]] = None, sp_client: Optional[RateLimitedSpotify] = None) -> None:
+    """Script entry point.
 
-    return deleted_total
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+        sp_client: Client to use; authenticates with Spotify when omitted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--dry-run", action="store_true",
+                        help="list the playlists that would be deleted, without deleting them")
+    parser.add_argument("--name", action="append", dest="names", metavar="NAME",
+                        help="only delete the playlist with this name (repeatable)")
+    parser.add_argument("--prefix", help="only delete playlists whose name starts with PREFIX")
+    args = parser.parse_args(argv)
 
+    with instrumented_run("delete_created_playlist") as metrics:
+        sp_client = sp_client or authenticate_spotify()
+        sp_client.instrument(metrics)
+        with metrics.stage("delete_playlists"):
+            total_deleted = delete_auto_playlists(
+                sp_client, DESCRIPTION_TAG,
+                names=args.names, prefix=args.prefix, dry_run=args.dry_run,
+            )
+        print(
+            f"\n✅ Finished. {'Would delete' if args.dry_run else 'Deleted'} "
+            f"{total_deleted} playlist(s) with '{DESCRIPTION_TAG}' in the description."
+        )
+        print(
+            f"Spotify throttling: {sp_client.throttled_seconds:.1f}s, "
+            f"{sp_client.retries} retry(ies)."
+        )
 
-def main() -> None:
-    """Script entry point."""
-    sp_client = authenticate_spotify()
-    total_deleted = delete_auto_playlists(sp_client, DESCRIPTION_TAG)
-    print(
-        f"\n✅ Finished. Deleted {total_deleted} playlist(s) "
-        f"with '{DESCRIPTION_TAG}' in the description."
-    )
 
 if __name__ == "__main__":
     main()
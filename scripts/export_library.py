@@ -0,0 +1,53 @@
+"""Export the local library to a columnar store for offline runs.
+
+Writes the liked-tracks snapshot, cached artist genres, cached Last.fm and
+Discogs results and computed labels (genre group, mood) to memory-mappable
+numpy arrays, without calling any API. `sporganized genres --offline`,
+`sporganized moods --offline` and `sporganized stats` then read the store.
+Run `sporganized sync` (or any sorting command) first to include the newest
+likes.
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import time
+from typing import List, Optional
+
+# ── Constants & Functions ─────────────────────────────────────────────────
+from src.constants import LIBRARY_STORE_DIR
+from src.library_store import LibraryStore, export_library
+
+
+def store_size(path: str) -> int:
+    """Total size in bytes of the files of a store."""
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Script entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--path", default=LIBRARY_STORE_DIR,
+                        help=f"store directory (default: {LIBRARY_STORE_DIR})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = export_library(args.path)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Exported {len(store)} track(s), {len(store.artist_id)} artist(s), "
+        f"{len(store.tag)} tag(s) ({int(store.enriched.sum())} track(s) with provider "
+        f"results) to {args.path} in {elapsed:.2f}s, {store_size(args.path) / 1024:.0f} KiB."
+    )
+
+    start = time.perf_counter()
+    LibraryStore(args.path).tracks()
+    print(f"Reading the tracks back takes {time.perf_counter() - start:.3f}s.")
+
+
+if __name__ == "__main__":
+    main()
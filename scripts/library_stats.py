@@ -0,0 +1,126 @@
+"""Show statistics about the locally stored library, without calling any API.
+
+Reads the liked-tracks snapshot, the artist genre cache, the saved mood
+model and the latest run reports from the cache directory, and the labels
+and tags of the exported library store (`sporganized export`) if there is one.
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+# ── Constants & Functions ─────────────────────────────────────────────────
+from src.constants import MOOD_MODEL_PATH, REPORT_DIR
+from src.genre_classifier import GenreClassifier
+from src.get_artists_genre import open_artist_genre_cache
+from src.isrc_index import IsrcIndex
+from src.library_snapshot import LibrarySnapshot
+from src.library_store import LibraryStore
+
+
+def format_time(timestamp: Optional[float]) -> str:
+    """Local date and time of an epoch timestamp, or 'never'."""
+    if timestamp is None:
+        return "never"
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def print_library_stats() -> None:
+    """Print liked-track, artist and genre-group counts from the local caches."""
+    snapshot = LibrarySnapshot()
+    try:
+        isrc_index = IsrcIndex()
+        tracks = [
+            (t.id, t.artist_ids, bool(t.isrc)) for t in isrc_index.collect(snapshot.tracks())
+        ]
+        print(f"Liked tracks:        {len(tracks)} ({sum(isrc for *_, isrc in tracks)} with ISRC)")
+        print(f"Duplicate likes:     {isrc_index.duplicates} (same ISRC as another liked track)")
+        print(f"Newest like:         {snapshot.watermark or 'none'}")
+        print(f"Last full sync:      {format_time(snapshot.last_full_sync)}")
+    finally:
+        snapshot.close()
+
+    artist_ids = {aid for _, ids, _ in tracks for aid in ids}
+    genre_cache = open_artist_genre_cache()
+    try:
+        artist_genres = genre_cache.get_many(artist_ids)
+        print(f"Artists:             {len(artist_ids)} ({len(artist_genres)} with cached genres)")
+    finally:
+        genre_cache.close()
+
+    if artist_genres:
+        grouped = GenreClassifier().classify_library(
+            ((tid, ids) for tid, ids, _ in tracks), artist_genres
+        )
+        print("Genre groups (from cached artist genres):")
+        for label, track_ids in sorted(grouped.items(), key=lambda kv: -len(kv[1])):
+            print(f"  {label}: {len(track_ids)} track(s)")
+
+
+def print_store_stats() -> None:
+    """Print the size, labels and most common tags of the exported library store."""
+    if not LibraryStore.exists():
+        print("Library store:       not exported yet (`sporganized export`)")
+        return
+    start = time.perf_counter()
+    store = LibraryStore()
+    moods = store.labels("mood")
+    tag_counts = np.bincount(
+        np.concatenate([store.lastfm_tags.values, store.discogs_genres.values]),
+        minlength=len(store.tag),
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Library store:       exported {format_time(store.exported_at)}, {len(store)} "
+        f"track(s), {int(store.enriched.sum())} with provider tags (read in {elapsed:.3f}s)"
+    )
+    if any(moods.values()):
+        print("Moods (saved model, at export):")
+        for mood, track_ids in sorted(moods.items(), key=lambda kv: -len(kv[1])):
+            print(f"  {mood}: {len(track_ids)} track(s)")
+    top_tags = np.argsort(-tag_counts, kind="stable")[:10]
+    if len(top_tags) and tag_counts[top_tags[0]]:
+        tags = ", ".join(f"{store.tag[i]} ({tag_counts[i]})" for i in top_tags if tag_counts[i])
+        print(f"Top tags:            {tags}")
+
+
+def print_run_stats() -> None:
+    """Print the mood model status and the latest report of each script."""
+    if os.path.exists(MOOD_MODEL_PATH):
+        print(f"Mood model:          saved {format_time(os.path.getmtime(MOOD_MODEL_PATH))}")
+    else:
+        print("Mood model:          not fitted yet")
+
+    latest = {}
+    for path in sorted(glob.glob(os.path.join(REPORT_DIR, "*.json"))):
+        latest[os.path.basename(path).rsplit("-", 2)[0]] = path
+    for script, path in sorted(latest.items()):
+        with open(path, encoding="utf-8") as fh:
+            report: Any = json.load(fh)
+        calls = sum(endpoint["calls"] for endpoint in report["endpoints"].values())
+        print(
+            f"Last {script}: {report['started_at']}, "
+            f"{report['wall_seconds']:.1f}s, {calls} API call(s)"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Script entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+    """
+    argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0]).parse_args(argv)
+    print_library_stats()
+    print_store_stats()
+    print_run_stats()
+
+
+if __name__ == "__main__":
+    main()
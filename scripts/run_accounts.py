@@ -0,0 +1,151 @@
+"""Run a Sporganized command for many Spotify accounts in parallel.
+
+Each account is identified by its OAuth token cache file (created by running
+any command once with `sporganized --token-cache PATH ...`). Every account
+runs in its own process, with its own Spotify rate budget and its own cache
+directory (liked tracks, journal, mood model, run reports) under
+`ACCOUNTS_DIR`, named after the token cache file and a hash of its full
+path (so `alice/.cache` and `bob/.cache` never share one), while artist
+genres and Last.fm/Discogs responses go through the shared cache, since
+popular artists overlap heavily between users. The Last.fm and Discogs
+budgets are split between the parallel processes, as they share one API key.
+
+Options not listed below are passed on to the command, e.g.
+    sporganized batch moods --accounts tokens/*.json --refit
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# ── Constants & Functions ─────────────────────────────────────────────────
+from src.constants import (
+    ACCOUNTS_DIR,
+    BATCH_PROCESSES,
+    DISCOGS_RATE,
+    LASTFM_RATE,
+    SHARED_CACHE_DB,
+)
+
+BATCH_COMMANDS = ("genres", "moods", "clean", "sync")
+
+AccountResult = Tuple[str, Optional[int], float, str]  # (name, exit code, seconds, log)
+
+
+def account_name(token_cache: str) -> str:
+    """Name an account after its token cache file (`tokens/alice.json` → `alice`)."""
+    name = os.path.splitext(os.path.basename(token_cache))[0].strip(".")
+    return name or "default"
+
+
+def account_dir(token_cache: str) -> str:
+    """Cache directory of an account: its name plus a short hash of the token cache's path.
+
+    Token caches with the same file name in different directories get
+    different directories.
+    """
+    digest = hashlib.sha1(os.path.abspath(token_cache).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(ACCOUNTS_DIR, f"{account_name(token_cache)}-{digest}")
+
+
+def run_account(
+    command: str, token_cache: str, options: List[str], processes: int
+) -> AccountResult:
+    """Run `sporganized COMMAND` for one account in a child process.
+
+    The command's output goes to `<account dir>/<command>.log`; the exit
+    code is None when the token cache does not exist.
+    """
+    name = account_name(token_cache)
+    directory = account_dir(token_cache)
+    log_path = os.path.join(directory, f"{command}.log")
+    if not os.path.exists(token_cache):
+        return name, None, 0.0, log_path
+    os.makedirs(directory, exist_ok=True)
+
+    env = dict(
+        os.environ,
+        SPORGANIZED_CACHE_DIR=directory,
+        SPORGANIZED_SHARED_CACHE=os.path.abspath(SHARED_CACHE_DB),
+        SPORGANIZED_LASTFM_RATE=str(LASTFM_RATE / processes),
+        SPORGANIZED_DISCOGS_RATE=str(DISCOGS_RATE / processes),
+    )
+    cli = [sys.executable, "-m", "src.cli", "--token-cache", os.path.abspath(token_cache)]
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(
+            [*cli, command, *options],
+            # no stdin: an expired login fails instead of waiting for the OAuth prompt
+            env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, check=False,
+        )
+    return name, proc.returncode, time.perf_counter() - start, log_path
+
+
+def read_accounts(paths: List[str], accounts_file: Optional[str]) -> List[str]:
+    """Token cache paths from the command line and/or a file (one per line).
+
+    A file listed twice, even under two spellings of its path, is kept once.
+    """
+    token_caches = list(paths)
+    if accounts_file:
+        with open(accounts_file, encoding="utf-8") as fh:
+            token_caches += [line.strip() for line in fh if line.strip()]
+    unique: Dict[str, str] = {}
+    for path in token_caches:
+        unique.setdefault(os.path.abspath(path), path)
+    return list(unique.values())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Script entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("command", choices=BATCH_COMMANDS, help="command to run for every account")
+    parser.add_argument("--accounts", nargs="+", default=[], metavar="TOKEN_CACHE",
+                        help="token cache file of each account")
+    parser.add_argument("--accounts-file", metavar="FILE",
+                        help="file listing one token cache path per line")
+    parser.add_argument("--processes", type=int, default=BATCH_PROCESSES,
+                        help=f"accounts run in parallel (default: {BATCH_PROCESSES})")
+    args, options = parser.parse_known_args(argv)
+
+    token_caches = read_accounts(args.accounts, args.accounts_file)
+    if not token_caches:
+        parser.error("no account given (use --accounts or --accounts-file)")
+    processes = max(1, min(args.processes, len(token_caches)))
+    print(f"Running '{args.command}' for {len(token_caches)} account(s), {processes} at a time.")
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=processes) as pool:
+        runs = [
+            pool.submit(run_account, args.command, path, options, processes)
+            for path in token_caches
+        ]
+        for path, run in zip(token_caches, runs):
+            name, returncode, seconds, log_path = run.result()
+            if returncode is None:
+                failed += 1
+                print(f"✗ {name} ({path}): no token cache, authenticate it once first")
+            elif returncode:
+                failed += 1
+                print(f"✗ {name} ({path}): exit code {returncode} after {seconds:.1f}s, "
+                      f"see {log_path}")
+            else:
+                print(f"✓ {name} ({path}): done in {seconds:.1f}s")
+
+    print(f"\n{len(token_caches) - failed}/{len(token_caches)} account(s) succeeded.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
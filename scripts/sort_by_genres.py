@@ -12,92 +12,156 @@ Environment variables to be set in a `.env` file (handled by python‑dotenv):
 """
 
 from __future__ import annotations
-from collections import defaultdict
-from typing import Dict, List
-import time
+import argparse
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 # ── Constants & Functions ─────────────────────────────────────────────────
-from src.fetch_liked_tracks import fetch_liked_tracks
+from src.fetch_liked_tracks import iter_liked_tracks
 from src.authenticate_spotify import authenticate_spotify
-from src.get_artists_genre import get_artists_genre
-from  src.constants import PLAYLIST_PREFIX, DESCRIPTION_TAG, RATE_DELAY
-from src.genre_groups import GENRE_GROUPS
+from src.rate_limited_spotify import RateLimitedSpotify
+from src.get_artists_genre import get_artists_genre, open_artist_genre_cache
+from src.playlist_index import PlaylistIndex
+from src.playlist_writer import PlaylistWriter
+from src.run_metrics import RunMetrics, instrumented_run
+from  src.constants import PLAYLIST_PREFIX, DESCRIPTION_TAG
+from src.genre_classifier import GenreClassifier
+from src.isrc_index import IsrcIndex
+
+if TYPE_CHECKING:  # numpy is only loaded by offline runs
+    from src.library_store import LibraryStore
+
+
+CLASSIFIER = GenreClassifier()
 
 
 def map_to_group(genre: str) -> str:
     """Return the broad group label for a genre, defaulting to 'Misc & Other'."""
-    for group_name, subgenres in GENRE_GROUPS.items():
-        if genre in subgenres:
-            return group_name
-    return "Misc & Other"
+    return CLASSIFIER.group_of(genre)
+
+
+def genre_playlist(group_label: str) -> Tuple[str, str]:
+    """Return the name and description of the playlist of a genre group."""
+    return (
+        f"{PLAYLIST_PREFIX} - {group_label}",
+        f"Sporganized generated playlist · {group_label} {DESCRIPTION_TAG}",
+    )
+
+def load_from_store(store: LibraryStore, isrc_index: IsrcIndex) -> Dict[str, List[str]]:
+    """Add the library store's tracks to `isrc_index` and return its artist genres."""
+    for record in store.tracks():
+        isrc_index.add(record)
+    return store.artist_genre_map()
 
-# ── Main function ──────────────────────────────────────────────────────────
-def main() -> None:
-    """Entry point: build or update one playlist per genre cluster."""
-    sp_client = authenticate_spotify()
-    user_id: str = sp_client.me()["id"]
-
-    liked_tracks = fetch_liked_tracks(sp_client)
-    print(f"Retrieved {len(liked_tracks)} liked track(s).")
-
-    # Collect unique artist IDs and fetch their genres
-    artist_ids = {
-        artist["id"] for track in liked_tracks for artist in track["artists"]
-    }
-    artist_genres_map = get_artists_genre(sp_client, list(artist_ids))
-
-    # Bucket tracks into genre‑groups
-    grouped_tracks: Dict[str, List[str]] = defaultdict(list)
-    for track in liked_tracks:
-        artist_id = track["artists"][0]["id"]
-        genres = artist_genres_map.get(artist_id, [])
-        if genres:
-            primary = genres[0]
-            group_label = map_to_group(primary)
-            grouped_tracks[group_label].append(track["id"])
-
-    # Summary
-    for label, tracks in grouped_tracks.items():
-        print(f"{label}: {len(tracks)} track(s)")
-
-    # Create or update playlists
-    for group_label, track_ids in grouped_tracks.items():
-        playlist_name = f"{PLAYLIST_PREFIX} - {group_label}"
-        description = (
-            f"Sporganized generated playlist · {group_label} {DESCRIPTION_TAG}"
-        )
 
-        # Check if playlist already exists
-        playlist_id: str | None = None
-        playlists_page = sp_client.current_user_playlists(limit=50)
-        while playlists_page:
-            for playlist in playlists_page["items"]:
-                owned = playlist["owner"]["id"] == user_id
-                if owned and playlist["name"].lower() == playlist_name.lower():
-                    playlist_id = playlist["id"]
-                    break
-            if playlist_id or not playlists_page["next"]:
-                break
-            playlists_page = sp_client.next(playlists_page)
-
-        if playlist_id:
-            print(f"Updating playlist: {playlist_name}")
-            sp_client.playlist_replace_items(playlist_id, [])
+def recordings(isrc_index: IsrcIndex) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Return the `(track ID, artist IDs)` of the canonical track of every recording."""
+    return [(t.id, t.artist_ids) for t in isrc_index.representatives()]
+
+
+def report_dedup(
+    isrc_index: IsrcIndex, grouped: Dict[str, List[str]], metrics: RunMetrics
+) -> None:
+    """Count and print the playlist writes saved by ISRC deduplication.
+
+    `grouped` holds canonical track IDs only.
+    """
+    entries, calls = isrc_index.savings(grouped.values())
+    metrics.count("isrc_duplicates", isrc_index.duplicates)
+    metrics.count("playlist_entries_saved", entries)
+    metrics.count("write_calls_saved", calls)
+    print(
+        f"ISRC dedup: {isrc_index.duplicates} duplicate recording(s) not classified, "
+        f"{entries} playlist entries and {calls} write call(s) saved."
+    )
+
+# ── Main function ──────────────────────────────────────────────────────────
+def main(argv: Optional[List[str]] = None, sp_client: Optional[RateLimitedSpotify] = None) -> None:
+    """Entry point: build or update one playlist per genre cluster.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+        sp_client: Client to use; authenticates with Spotify when omitted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="classify the exported library store (`sporganized export`) without "
+             "calling Spotify; no playlist is written",
+    )
+    args = parser.parse_args(argv)
+    if args.offline:
+        # pylint: disable-next=import-outside-toplevel
+        from src.library_store import LibraryStore
+        if not LibraryStore.exists():
+            print("No library store yet: run `sporganized export` first.")
+            return
+
+    with instrumented_run("sort_by_genres") as metrics:
+        isrc_index = IsrcIndex()
+        if args.offline:
+            with metrics.stage("load_store"):
+                artist_genres_map = load_from_store(LibraryStore(), isrc_index)
+                liked_tracks = recordings(isrc_index)
+            print(f"Loaded {isrc_index.tracks} liked track(s) from the library store.")
         else:
-            print(f"Creating playlist: {playlist_name}")
-            playlist = sp_client.user_playlist_create(
-                user=user_id,
-                name=playlist_name,
-                public=True,
-                description=description,
+            sp_client = sp_client or authenticate_spotify()
+            sp_client.instrument(metrics)
+
+            # Stream compact records into the index, keeping one track per recording
+            with metrics.stage("fetch_liked_tracks"):
+                for _ in iter_liked_tracks(sp_client, incremental=True, isrc_index=isrc_index):
+                    pass
+                liked_tracks = recordings(isrc_index)
+            print(f"Retrieved {isrc_index.tracks} liked track(s).")
+
+            # Collect unique artist IDs and fetch their genres
+            with metrics.stage("artist_genres"):
+                artist_ids = {artist_id for _, ids in liked_tracks for artist_id in ids}
+                genre_cache = open_artist_genre_cache()
+                artist_genres_map = get_artists_genre(sp_client, list(artist_ids), genre_cache)
+            print(
+                f"Artist genre cache: {genre_cache.hits} hit(s), "
+                f"{genre_cache.misses} miss(es) fetched from Spotify."
             )
-            playlist_id = playlist["id"]
-
-        # Add tracks in 100‑track batches
-        for start in range(0, len(track_ids), 100):
-            sp_client.playlist_add_items(playlist_id, track_ids[start : start + 100])
-            time.sleep(RATE_DELAY)
+            genre_cache.close()
 
+        # Bucket tracks into genre‑groups, scoring every genre of every artist.
+        # Same recording liked several times: only its canonical track is classified
+        with metrics.stage("classify"):
+            grouped_tracks: Dict[str, List[str]] = CLASSIFIER.classify_library(
+                liked_tracks, artist_genres_map
+            )
+        report_dedup(isrc_index, grouped_tracks, metrics)
+
+        # Summary
+        for label, tracks in grouped_tracks.items():
+            print(f"{label}: {len(tracks)} track(s)")
+        if args.offline:
+            print("Offline run: no playlist written.")
+            return
+
+        # Create or update playlists, writing them concurrently
+        with metrics.stage("write_playlists"):
+            playlist_index = PlaylistIndex(sp_client)
+            plans = {}
+            with PlaylistWriter() as writer:
+                for group_label, track_ids in grouped_tracks.items():
+                    playlist_name, description = genre_playlist(group_label)
+                    playlist_id, created = playlist_index.get_or_create(
+                        playlist_name, description
+                    )
+                    print(f"{'Creating' if created else 'Updating'} playlist: {playlist_name}")
+                    plans[playlist_name] = writer.sync(
+                        sp_client, playlist_id, track_ids, not created
+                    )
+
+        for playlist_name, plan in plans.items():
+            print(f"{playlist_name}: +{plan.result().added} / -{plan.result().removed} track(s)")
+
+        print(
+            f"Spotify throttling: {sp_client.throttled_seconds:.1f}s, "
+            f"{sp_client.retries} retry(ies)."
+        )
 
 if __name__ == "__main__":
     main()
@@ -6,129 +6,256 @@ Environment variables to be set in a `.env` file (handled by python‑dotenv):
     - SPOTIPY_CLIENT_SECRET
     - SPOTIPY_REDIRECT_URI
 """
- 
+
+import argparse
+import functools
 import time
 from collections import defaultdict
-from typing import List
-import numpy as np
-import requests
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 
 # ── Constants & Functions ─────────────────────────────────────────────────
-from src.fetch_liked_tracks import fetch_liked_tracks
+from src.fetch_liked_tracks import iter_liked_tracks
 from src.authenticate_spotify import authenticate_spotify
+from src.enrich_metadata import enrich_tracks
+from src.isrc_index import IsrcIndex
+from src.library_store import LibraryStore
+from src.metadata_providers import lastfm_client, discogs_client
+from src.mood_model import MoodModel, track_features
+from src.playlist_index import PlaylistIndex
+from src.playlist_writer import PlaylistWriter
+from src.run_journal import RunJournal
+from src.run_metrics import instrumented_run
 from src.constants import (
-    LASTFM_API_URL,
-    DISCOG_API_URL,
-    N_CLUSTERS,
     MOOD_LABELS,
-    RATE_DELAY,
     PLAYLIST_PREFIX,
     DESCRIPTION_TAG,
-    LASTFM_API_KEY,
 )
 
-# ── Last.fm lookup ─────────────────────────────────────────────────────────
-def get_lastfm_tags(artist: str, track: str) -> List[str]:
-    url = f"{LASTFM_API_URL}?method=track.gettoptags&artist={artist}&track={track}&api_key={LASTFM_API_KEY}&format=json"
-    try:
-        r = requests.get(url, timeout=10)
-        tags = r.json().get("toptags", {}).get("tag", [])
-        return [tag["name"] for tag in tags if float(tag.get("count", 0)) > 10]
-    except Exception:
-        return []
-
-# ── Discogs lookup ─────────────────────────────────────────────────────────
-def get_discogs_genre(artist: str, track: str) -> List[str]:
-    url = f"{DISCOG_API_URL}?artist={artist}&track={track}"
-    try:
-        r = requests.get(url, timeout=10)
-        results = r.json().get("results", [])
-        return results[0].get("genre", []) if results else []
-    except Exception:
-        return []
-
-# ── Placeholder for Genius or fallback features ────────────────────────────
-def get_fallback_features(track: dict) -> List[float]:
-    tags = get_lastfm_tags(track['artist'], track['name'])
-    genres = get_discogs_genre(track['artist'], track['name'])
-    # crude feature: 1 if any metadata found
-    score = float(bool(set(tags + genres)))
-    return [score, 0, 0, 0] if score else []
-
-# ── ML helpers ─────────────────────────────────────────────────────────────
-def cluster_features(mat: np.ndarray):
-    scaler = StandardScaler()
-    X = scaler.fit_transform(mat)
-    labels = KMeans(n_clusters=N_CLUSTERS, random_state=42).fit_predict(X)
-    return labels
-
-def map_clusters_to_moods(mat: np.ndarray, labels: np.ndarray):
-    arr = []
-    for k in range(N_CLUSTERS):
-        sub = mat[labels == k]
-        if sub.size:
-            arr.append((k, sub[:,0].mean()))
-    arr.sort(key=lambda x: x[1])
-    return {idx: mood for (idx, *_), mood in zip(arr, MOOD_LABELS)}
+# ── Pipeline ───────────────────────────────────────────────────────────────
+def enrich_library(tracks, metrics, journal):
+    """Return `(feature dicts, track IDs)` of the tracks that have metadata.
 
-# ── Main ───────────────────────────────────────────────────────────────────
-def main():
-    sp = authenticate_spotify()
-    uid = sp.me()['id']
-    tracks = fetch_liked_tracks(sp, True)
-    print(f"Got {len(tracks)} liked tracks with ISRCs")
+    Tracks already enriched in `journal` are not looked up again; new
+    results are journaled as they arrive.
+    """
+    enriched = journal.load("features")
+    lastfm, discogs = lastfm_client(), discogs_client()
+    lastfm.instrument(metrics)
+    discogs.instrument(metrics)
+    todo = [t for t in tracks if t.id not in enriched]
+    with metrics.stage("enrich"):
+        for t, (tags, genres) in zip(todo, enrich_tracks(todo, lastfm=lastfm, discogs=discogs)):
+            enriched[t.id] = track_features(tags, genres)
+            journal.record("features", t.id, enriched[t.id])
+    for client in (lastfm, discogs):
+        print(
+            f"{client.name}: {client.cache.hits} cached response(s), "
+            f"{client.coalesced} coalesced, {client.sent} request(s) sent."
+        )
+        client.close()
 
     feats, ids = [], []
     for t in tracks:
-        f = get_fallback_features(t)  # replace AB call with fallback
+        f = enriched[t.id]
         if f:
             feats.append(f)
-            ids.append(t['id'])
-        time.sleep(RATE_DELAY)
+            ids.append(t.id)
+    return feats, ids
 
-    if not feats:
-        print("No usable metadata—exiting.")
-        return
 
-    print(f"Valid feature vectors: {len(feats)} / {len(tracks)}")
-    mat = np.array(feats)
-    labels = cluster_features(mat)
-    cmap = map_clusters_to_moods(mat, labels)
+def assign_moods(feats, ids, journal=None, refit=False):
+    """Return the mood of each feature dict, or None if no model can be fitted.
+
+    Labels journaled by an interrupted run are reused when they cover every track.
+    """
+    labeled = journal.load("label") if journal else {}
+    if labeled and all(tid in labeled for tid in ids):
+        print("Reusing the labels of the interrupted run.")
+        return [labeled[tid] for tid in ids]
+
+    model = None if refit else MoodModel.load()
+    if model is None:
+        try:
+            model = MoodModel.fit(feats)
+        except ValueError as exc:
+            print(f"{exc}—exiting.")
+            return None
+        model.save()
+        print(f"Fitted {len(model.moods)} mood clusters over {len(model.vocabulary)} tags.")
+    else:
+        print("Assigning tracks to saved mood centroids (use --refit to re-cluster).")
+    labels = model.predict(feats)
+    if journal:
+        for tid, mood in zip(ids, labels):
+            journal.record("label", tid, mood)
+        journal.flush()
+    return labels
+
 
+def report_dedup(index, duplicates, bucket, metrics):
+    """Count and print the lookups and playlist writes saved by ISRC deduplication.
+
+    `duplicates` tracks were not enriched; `bucket` holds canonical track IDs only.
+    """
+    entries, calls = index.savings(bucket.values())
+    metrics.count("isrc_duplicates", duplicates)
+    metrics.count("lookups_saved", 2 * duplicates)  # one Last.fm and one Discogs lookup
+    metrics.count("playlist_entries_saved", entries)
+    metrics.count("write_calls_saved", calls)
+    print(
+        f"ISRC dedup: {duplicates} duplicate recording(s) not enriched ({2 * duplicates} "
+        f"lookups saved), {entries} playlist entries and {calls} write call(s) saved."
+    )
+
+
+def bucket_by_mood(ids, labels):
+    """Group track IDs by mood and print the size of each mood."""
     bucket = defaultdict(list)
-    for tid, lbl in zip(ids, labels):
-        bucket[cmap[lbl]].append(tid)
+    for tid, mood in zip(ids, labels):
+        if mood:
+            bucket[mood].append(tid)
 
     for mood in MOOD_LABELS:
         print(f"{mood}: {len(bucket[mood])} tracks")
+    return bucket
+
+
+def mood_playlist(mood):
+    """Return the name and description of the playlist of a mood."""
+    return f"{PLAYLIST_PREFIX} - {mood}", f"Auto‑{mood} {DESCRIPTION_TAG}"
+
+
+def record_playlist(journal, pname, plan):
+    """Journal that every batch of `plan` was applied to playlist `pname`."""
+    journal.record("playlist", pname, {"added": plan.added, "removed": plan.removed})
+    journal.flush()
+
+
+def write_mood_playlists(sp, bucket, journal):
+    """Sync one playlist per mood; playlists finished in `journal` are skipped."""
+    written = journal.load("playlist")
+    index = PlaylistIndex(sp)
+    plans = {}
+    with PlaylistWriter() as writer:
+        for mood, tids in bucket.items():
+            pname, desc = mood_playlist(mood)
+            if not tids or pname in written:
+                continue
+            pid, created = index.get_or_create(pname, desc)
+            print("Creating" if created else "Updating", pname)
+            done = functools.partial(record_playlist, journal, pname)
+            plans[pname] = writer.sync(sp, pid, tids, not created, then=done)
+
+    for pname, plan in plans.items():
+        print(f"{pname}: +{plan.result().added} / -{plan.result().removed} tracks")
+
+
+def organize_moods(sp, metrics, journal, refit=False):
+    """Enrich liked tracks, assign moods and update mood playlists.
+
+    Each step runs as a `metrics` stage; Last.fm/Discogs calls are recorded too.
+    Enriched tracks, labels and finished playlists are written to `journal`,
+    and whatever it already holds (a resumed run) is not redone.
+    """
+    index = IsrcIndex()
+    with metrics.stage("fetch_liked_tracks"):
+        tracks = [t for t in iter_liked_tracks(sp, incremental=True, isrc_index=index) if t.isrc]
+    # One canonical track per recording is enriched and written
+    recordings = [t for t in index.representatives() if t.isrc]
+    print(f"Got {len(tracks)} liked tracks with ISRCs ({len(recordings)} distinct recordings)")
+    if journal.resumed:
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(journal.started_at))
+        print(f"Resuming the run started {started}.")
+
+    feats, ids = enrich_library(recordings, metrics, journal)
+    if not feats:
+        print("No usable metadata—exiting.")
+        return
+
+    print(f"Valid feature vectors: {len(feats)} / {len(recordings)}")
+    with metrics.stage("mood_model"):
+        labels = assign_moods(feats, ids, journal, refit)
+    if labels is None:
+        return
+
+    bucket = bucket_by_mood(ids, labels)
+    report_dedup(index, len(tracks) - len(recordings), bucket, metrics)
+    with metrics.stage("write_playlists"):
+        write_mood_playlists(sp, bucket, journal)
+    journal.finish()
+
+    print(f"Spotify throttling: {sp.throttled_seconds:.1f}s, {sp.retries} retries")
+
+
+def classify_offline(metrics, refit=False):
+    """Assign moods to the tracks of the library store, without any API call.
+
+    Uses the Last.fm/Discogs results exported with the store; no playlist is written.
+    """
+    with metrics.stage("load_store"):
+        store = LibraryStore()
+        index = IsrcIndex()
+        metadata = {}
+        for t, meta in zip(store.tracks(), store.provider_metadata()):
+            index.add(t)
+            metadata[t.id] = meta
+        # One canonical track per recording, as in online runs
+        feats, ids = [], []
+        for t in index.representatives():
+            meta = metadata[t.id]
+            f = track_features(*meta) if t.isrc and meta else None
+            if f:
+                feats.append(f)
+                ids.append(t.id)
+    print(
+        f"Loaded {len(store)} liked tracks from the library store "
+        f"({len(index)} distinct recordings), {len(feats)} with metadata"
+    )
+    if not feats:
+        print("No usable metadata—run `sporganized moods` once, then `sporganized export`.")
+        return
+
+    with metrics.stage("mood_model"):
+        labels = assign_moods(feats, ids, refit=refit)
+    if labels is not None:
+        bucket_by_mood(ids, labels)
+        print("Offline run: no playlist written.")
+
+# ── Main ───────────────────────────────────────────────────────────────────
+def main(argv=None, sp=None):
+    """Entry point: parse options and run the mood pipeline with a run report.
+
+    `argv` defaults to the command line; `sp` (a Spotify client) is
+    authenticated when omitted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "--refit", action="store_true",
+        help="re-cluster the whole library instead of reusing the saved mood centroids",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue an interrupted run, skipping tracks and playlists it already finished",
+    )
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="assign moods to the exported library store (`sporganized export`) without "
+             "calling any API; no playlist is written",
+    )
+    args = parser.parse_args(argv)
+
+    if args.offline:
+        if not LibraryStore.exists():
+            print("No library store yet: run `sporganized export` first.")
+            return
+        with instrumented_run("sort_by_mood") as metrics:
+            classify_offline(metrics, refit=args.refit)
+        return
 
-    for mood, tids in bucket.items():
-        if not tids:
-            continue
-        pname = f"{PLAYLIST_PREFIX} - {mood}"
-        desc = f"Auto‑{mood} {DESCRIPTION_TAG}"
-        pid = None
-        pg = sp.current_user_playlists(limit=50)
-        while pg:
-            for pl in pg['items']:
-                if pl['owner']['id'] == uid and pl['name'].lower() == pname.lower():
-                    pid = pl['id']
-                    break
-            if pid or not pg['next']:
-                break
-            pg = sp.next(pg)
-
-        if pid:
-            print("Updating", pname)
-            sp.playlist_replace_items(pid, [])
-        else:
-            print("Creating", pname)
-            pid = sp.user_playlist_create(uid, pname, description=desc)['id']
-
-        for i in range(0, len(tids), 100):
-            sp.playlist_add_items(pid, tids[i:i+100])
+    with instrumented_run("sort_by_mood") as metrics, \
+            RunJournal("sort_by_mood", resume=args.resume) as journal:
+        sp = sp or authenticate_spotify()
+        sp.instrument(metrics)
+        organize_moods(sp, metrics, journal, refit=args.refit)
 
 if __name__ == "__main__":
     main()
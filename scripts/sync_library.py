@@ -0,0 +1,51 @@
+"""Bring the local snapshot of the user's liked songs up to date.
+
+Only tracks liked since the last sync are fetched; `--full` re-reads the
+whole library (also dropping un-liked tracks).
+
+Environment variables to be set in a `.env` file (handled by python‑dotenv):
+    - SPOTIPY_CLIENT_ID
+    - SPOTIPY_CLIENT_SECRET
+    - SPOTIPY_REDIRECT_URI
+"""
+
+from __future__ import annotations
+import argparse
+from typing import List, Optional
+
+# ── Constants & Functions ─────────────────────────────────────────────────
+from src.authenticate_spotify import authenticate_spotify
+from src.library_snapshot import LibrarySnapshot
+from src.rate_limited_spotify import RateLimitedSpotify
+from src.run_metrics import instrumented_run
+
+
+def main(argv: Optional[List[str]] = None, sp_client: Optional[RateLimitedSpotify] = None) -> None:
+    """Script entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+        sp_client: Client to use; authenticates with Spotify when omitted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--full", action="store_true",
+                        help="re-read the whole library instead of only the new likes")
+    args = parser.parse_args(argv)
+
+    with instrumented_run("sync_library") as metrics:
+        sp_client = sp_client or authenticate_spotify()
+        sp_client.instrument(metrics)
+        snapshot = LibrarySnapshot()
+        try:
+            with metrics.stage("fetch_liked_tracks"):
+                snapshot.sync(sp_client, full=args.full)
+            print(
+                f"Library sync: {snapshot.new_tracks} new track(s) in "
+                f"{snapshot.pages_fetched} page(s); {len(snapshot)} liked track(s) stored."
+            )
+        finally:
+            snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
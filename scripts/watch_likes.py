@@ -0,0 +1,274 @@
+"""Watch the liked songs and file new likes into the generated playlists.
+
+Every `--interval` seconds a single small request checks for new likes (an
+incremental sync of the library snapshot, which stops at the first known
+track). Only the new tracks are classified: into a genre group from their
+artists' genres, and into a mood with the saved mood centroids (run
+`sporganized moods` once to fit them). They are appended to the matching
+`PLAYLIST_PREFIX` playlists, created when missing, without reading or
+rebuilding the playlists. A new like of a recording already in the library
+(same ISRC, e.g. the single of a liked album track) is skipped.
+
+Each cycle that places tracks prints its API calls and the like-to-playlist
+latency (from Spotify's `added_at` to the end of the append). Stop with
+Ctrl+C: a summary is printed and the run report written.
+
+Environment variables to be set in a `.env` file (handled by python‑dotenv):
+    - SPOTIPY_CLIENT_ID
+    - SPOTIPY_CLIENT_SECRET
+    - SPOTIPY_REDIRECT_URI
+"""
+
+from __future__ import annotations
+import argparse
+import calendar
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from requests import RequestException
+from spotipy.exceptions import SpotifyException
+
+# ── Constants & Functions ─────────────────────────────────────────────────
+from scripts.sort_by_genres import CLASSIFIER, genre_playlist
+from scripts.sort_by_mood import mood_playlist
+from src.authenticate_spotify import authenticate_spotify
+from src.constants import PLAYLIST_BATCH_SIZE, WATCH_INTERVAL, WATCH_PAGE_SIZE
+from src.enrich_metadata import enrich_tracks
+from src.isrc_index import IsrcIndex
+from src.get_artists_genre import get_artists_genre, open_artist_genre_cache
+from src.library_snapshot import LibrarySnapshot
+from src.metadata_providers import discogs_client, lastfm_client
+from src.mood_model import MoodModel, track_features
+from src.playlist_index import PlaylistIndex
+from src.playlist_writer import PlaylistWriter
+from src.rate_limited_spotify import RateLimitedSpotify
+from src.run_metrics import RunMetrics, instrumented_run
+from src.track_record import TrackRecord
+
+Playlist = Tuple[str, str]  # (name, description)
+
+
+def liked_at(track: TrackRecord) -> Optional[float]:
+    """Epoch time at which a track was liked, if Spotify reported it."""
+    try:
+        return calendar.timegm(time.strptime(track.added_at, "%Y-%m-%dT%H:%M:%SZ"))
+    except ValueError:
+        return None
+
+
+class LikeWatcher:  # pylint: disable=too-many-instance-attributes
+    """Places newly liked tracks into the genre and mood playlists.
+
+    Args:
+        sp_client: Authenticated Spotify client.
+        metrics: Run collector, used for stages and per-cycle API costs.
+        moods: Also place tracks by mood (needs a saved mood model).
+    """
+
+    def __init__(
+        self, sp_client: RateLimitedSpotify, metrics: RunMetrics, moods: bool = True
+    ) -> None:
+        self.sp_client = sp_client
+        self.metrics = metrics
+        self.snapshot = LibrarySnapshot()
+        self.genre_cache = open_artist_genre_cache()
+        self.model = MoodModel.load() if moods else None
+        self.lastfm = self.discogs = None
+        if self.model is not None:
+            self.lastfm, self.discogs = lastfm_client(), discogs_client()
+            self.lastfm.instrument(metrics)
+            self.discogs.instrument(metrics)
+        self.index: Optional[PlaylistIndex] = None  # read once, at the first new like
+        self.isrc_index = IsrcIndex()  # recordings already in the library
+        self.pending: List[TrackRecord] = []  # new likes not placed yet (failed cycle)
+        # Tracks of `pending` already appended to a playlist, not to append again
+        self.written: Dict[Playlist, Set[str]] = defaultdict(set)
+
+        self.cycles = 0
+        self.placed = 0
+        self.skipped = 0
+        self.latencies: List[float] = []
+        self.idle_calls = 0
+        self.busy_calls: List[int] = []
+
+    # ── Cycle ──────────────────────────────────────────────────────────────
+    def start(self) -> None:
+        """Bring the snapshot up to date; likes made before the watch are not placed."""
+        with self.metrics.stage("fetch_liked_tracks"):
+            self.snapshot.sync(self.sp_client)
+            for track in self.snapshot.tracks():
+                self.isrc_index.add(track)
+        moods = "genre and mood" if self.model is not None else "genre"
+        print(f"Watching {len(self.snapshot)} liked track(s); new likes go to {moods} playlists.")
+        if self.model is None:
+            print("(No saved mood model: run `sporganized moods` once to place tracks by mood.)")
+
+    def poll(self) -> None:
+        """Check for new likes once, and place them."""
+        self.cycles += 1
+        calls = self.metrics.total_calls()
+        try:
+            with self.metrics.stage("poll"):
+                self.snapshot.sync(self.sp_client, reconcile=False, page_size=WATCH_PAGE_SIZE)
+            new = self.pending + self.snapshot.new_records[::-1]  # oldest first
+            if not new:
+                self.idle_calls += self.metrics.total_calls() - calls
+                return
+            self.pending = new
+            fresh = self.new_recordings(new)
+            playlists = self.classify(fresh) if fresh else {}
+            self.append(playlists)
+        except (SpotifyException, RequestException) as exc:
+            print(f"Cycle {self.cycles} failed, retrying next cycle: {exc}")
+            return
+        self.pending = []
+        self.written.clear()
+        for track in fresh:
+            self.isrc_index.add(track)
+        skipped = len(new) - len(fresh)
+        self.skipped += skipped
+        self.metrics.count("duplicate_likes_skipped", skipped)
+        new = fresh
+
+        done = time.time()
+        latencies = [done - stamp for stamp in map(liked_at, new) if stamp is not None]
+        self.latencies += latencies
+        self.placed += len(new)
+        self.busy_calls.append(self.metrics.total_calls() - calls)
+        names = ", ".join(sorted(name for name, _ in playlists)) or "no playlist"
+        latency = (
+            f"; placed {statistics.median(latencies):.1f}s after the like "
+            f"(max {max(latencies):.1f}s)" if latencies else ""
+        )
+        duplicates = f" ({skipped} already-liked recording(s) skipped)" if skipped else ""
+        print(
+            f"{len(new)} new like(s){duplicates} → {names}: "
+            f"{self.busy_calls[-1]} API call(s){latency}"
+        )
+
+    def new_recordings(self, tracks: List[TrackRecord]) -> List[TrackRecord]:
+        """Keep the first like of each recording not already in the library."""
+        seen = IsrcIndex()
+        fresh = []
+        for track in tracks:
+            if track not in self.isrc_index and track not in seen:
+                seen.add(track)
+                fresh.append(track)
+        return fresh
+
+    def classify(self, tracks: List[TrackRecord]) -> Dict[Playlist, List[str]]:
+        """Return the playlists the new tracks belong in, with their track IDs."""
+        with self.metrics.stage("artist_genres"):
+            artist_ids = list({aid for t in tracks for aid in t.artist_ids})
+            genres = get_artists_genre(self.sp_client, artist_ids, self.genre_cache)
+
+        playlists: Dict[Playlist, List[str]] = defaultdict(list)
+        with self.metrics.stage("classify"):
+            for t in tracks:
+                group = CLASSIFIER.classify(genres.get(aid, ()) for aid in t.artist_ids)
+                if group:
+                    playlists[genre_playlist(group)].append(t.id)
+
+        if self.model is not None:
+            with_isrc = [t for t in tracks if t.isrc]
+            with self.metrics.stage("enrich"):
+                metadata = list(enrich_tracks(with_isrc, lastfm=self.lastfm, discogs=self.discogs))
+            with self.metrics.stage("mood_model"):
+                feats = [track_features(tags, found) for tags, found in metadata]
+                for t, mood in zip(with_isrc, self.model.predict(feats)):
+                    if mood:
+                        playlists[mood_playlist(mood)].append(t.id)
+        return playlists
+
+    def append(self, playlists: Dict[Playlist, List[str]]) -> None:
+        """Append the tracks at the end of their playlists, creating missing ones.
+
+        Batches that went through are remembered in `written`, so retrying a
+        failed cycle only appends what is still missing.
+        """
+        batches = []
+        with self.metrics.stage("write_playlists"):
+            try:
+                with PlaylistWriter() as writer:
+                    for playlist, track_ids in playlists.items():
+                        track_ids = [t for t in track_ids if t not in self.written[playlist]]
+                        if not track_ids:
+                            continue
+                        if self.index is None:
+                            self.index = PlaylistIndex(self.sp_client)
+                        playlist_id, _ = self.index.get_or_create(*playlist)
+                        for start in range(0, len(track_ids), PLAYLIST_BATCH_SIZE):
+                            batch = track_ids[start:start + PLAYLIST_BATCH_SIZE]
+                            for future in writer.append(self.sp_client, playlist_id, batch):
+                                batches.append((playlist, batch, future))
+            finally:
+                for playlist, batch, future in batches:
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        self.written[playlist].update(batch)
+
+    # ── Summary ────────────────────────────────────────────────────────────
+    def print_summary(self) -> None:
+        """Print placed likes, API cost per cycle and like-to-playlist latency."""
+        idle_cycles = self.cycles - len(self.busy_calls)
+        print(
+            f"{self.cycles} cycle(s), {self.placed} new like(s) placed, "
+            f"{self.skipped} already-liked recording(s) skipped."
+        )
+        if idle_cycles:
+            print(f"API calls per cycle without new likes: {self.idle_calls / idle_cycles:.2f}")
+        if self.busy_calls:
+            print(f"API calls per cycle with new likes: {statistics.mean(self.busy_calls):.1f}")
+        if self.latencies:
+            print(
+                f"Like-to-playlist latency: median {statistics.median(self.latencies):.1f}s, "
+                f"max {max(self.latencies):.1f}s"
+            )
+
+    def close(self) -> None:
+        """Close the snapshot, caches and provider sessions."""
+        self.snapshot.close()
+        self.genre_cache.close()
+        for client in (self.lastfm, self.discogs):
+            if client is not None:
+                client.close()
+
+
+# ── Main ───────────────────────────────────────────────────────────────────
+def main(argv: Optional[List[str]] = None, sp_client: Optional[RateLimitedSpotify] = None) -> None:
+    """Script entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to `sys.argv`).
+        sp_client: Client to use; authenticates with Spotify when omitted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL,
+                        help=f"seconds between two checks (default: {WATCH_INTERVAL})")
+    parser.add_argument("--cycles", type=int, default=0,
+                        help="stop after this many checks (default: run until Ctrl+C)")
+    parser.add_argument("--no-moods", action="store_true",
+                        help="only place new likes in genre playlists")
+    args = parser.parse_args(argv)
+
+    with instrumented_run("watch_likes") as metrics:
+        sp_client = sp_client or authenticate_spotify()
+        sp_client.instrument(metrics)
+        watcher = LikeWatcher(sp_client, metrics, moods=not args.no_moods)
+        try:
+            watcher.start()
+            while not args.cycles or watcher.cycles < args.cycles:
+                started = time.monotonic()
+                watcher.poll()
+                if not args.cycles or watcher.cycles < args.cycles:
+                    time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        finally:
+            watcher.print_summary()
+            watcher.close()
+
+
+if __name__ == "__main__":
+    main()
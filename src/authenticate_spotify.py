@@ -5,29 +5,44 @@ Handles authentication with the Spotify API using Spotipy and environment variab
 
 - Loads client credentials from a `.env` file.
 - Defines Spotify OAuth scopes.
-- Provides a function to return an authenticated Spotipy client.
+- Provides a function to return an authenticated Spotipy client, wrapped in
+  the shared rate limiter / retry layer.
 """
 
+import requests
 import spotipy
+from spotipy.cache_handler import CacheFileHandler
 from spotipy.oauth2 import SpotifyOAuth
-from src.constants import CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPE 
+from src import constants
+from src.constants import SCOPE, TOKEN_CACHE_PATH
+from src.rate_limited_spotify import RateLimitedSpotify
 
-def authenticate_spotify() -> spotipy.Spotify:
+def authenticate_spotify(cache_path: str = TOKEN_CACHE_PATH) -> RateLimitedSpotify:
     """
     Authenticate with Spotify and return a Spotipy client.
 
     Reads client ID, client secret, and redirect URI from environment variables,
     and uses the SpotifyOAuth flow with the predefined scope.
 
+    Spotipy's own urllib3 retries are disabled (plain session) so that
+    throttling is handled in one place, with `Retry-After` visible.
+
+    Parameters
+    ----------
+    cache_path : str
+        File caching the OAuth token, so later runs do not open the browser.
+
     Returns
     -------
-    spotipy.Spotify
-        Authenticated Spotipy client ready for API requests.
+    RateLimitedSpotify
+        Authenticated, rate-limited Spotipy client ready for API requests.
     """
     auth_manager = SpotifyOAuth(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        redirect_uri=REDIRECT_URI,
+        client_id=constants.CLIENT_ID,
+        client_secret=constants.CLIENT_SECRET,
+        redirect_uri=constants.REDIRECT_URI,
         scope=SCOPE,
+        cache_handler=CacheFileHandler(cache_path=cache_path),
     )
-    return spotipy.Spotify(auth_manager=auth_manager)
+    client = spotipy.Spotify(auth_manager=auth_manager, requests_session=requests.Session())
+    return RateLimitedSpotify(client)
@@ -0,0 +1,108 @@
+"""
+cli.py
+
+`sporganized` command-line entry point.
+
+    sporganized genres            sort liked tracks into genre playlists
+    sporganized moods [--refit]   sort liked tracks into mood playlists
+    sporganized clean [--dry-run] delete the generated playlists
+    sporganized sync [--full]     update the local liked-tracks snapshot
+    sporganized watch             place new likes into the playlists as they come
+    sporganized stats             show local library statistics (offline)
+    sporganized export            write the library store used by --offline runs
+    sporganized batch COMMAND --accounts TOKEN_CACHE...
+                                  run a command for many accounts in parallel
+
+Each subcommand is the matching script in `scripts/`; options after the
+subcommand are passed on to it (`sporganized moods --help`). Scripts are
+only imported once their subcommand is chosen, so a command never pays for
+the heavy dependencies of another (numpy / scikit-learn for `moods`,
+spotipy for anything that calls the API). Commands that call Spotify share
+one authenticated client and its token cache; none is created for `--help`
+or `--offline` runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+from src.constants import TOKEN_CACHE_PATH
+
+NO_CLIENT_OPTIONS = frozenset({"-h", "--help", "--offline"})  # no API call is made
+GLOBAL_OPTIONS = ("--token-cache", "--timings")  # only valid before the subcommand
+
+
+class Command(NamedTuple):
+    """A subcommand and the script implementing it."""
+
+    module: str
+    help: str
+    needs_spotify: bool = True
+
+
+COMMANDS = {
+    "genres": Command("scripts.sort_by_genres", "sort liked tracks into genre playlists"),
+    "moods": Command("scripts.sort_by_mood", "sort liked tracks into mood playlists"),
+    "clean": Command("scripts.delete_created_playlist", "delete the generated playlists"),
+    "sync": Command("scripts.sync_library", "update the local liked-tracks snapshot"),
+    "watch": Command("scripts.watch_likes", "place new likes into the playlists as they come"),
+    "stats": Command("scripts.library_stats", "show local library statistics", False),
+    "export": Command("scripts.export_library", "export the library for offline runs", False),
+    "batch": Command("scripts.run_accounts", "run a command for many accounts in parallel", False),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the top-level parser (subcommand options are parsed by the scripts)."""
+    parser = argparse.ArgumentParser(
+        prog="sporganized", description="Organize your Spotify liked songs."
+    )
+    parser.add_argument("--token-cache", metavar="PATH", default=TOKEN_CACHE_PATH,
+                        help=f"OAuth token cache file (default: {TOKEN_CACHE_PATH})")
+    parser.add_argument("--timings", action="store_true",
+                        help="print start-up and total time on stderr")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    for name, command in COMMANDS.items():
+        subparsers.add_parser(name, help=command.help, add_help=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Console entry point."""
+    start = time.perf_counter()
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    # The scripts' own parsers would only report them as unrecognized
+    misplaced = [arg.split("=", 1)[0] for arg in rest if arg.split("=", 1)[0] in GLOBAL_OPTIONS]
+    if misplaced:
+        parser.error(
+            f"{misplaced[0]} is a global option: put it before the subcommand "
+            f"(sporganized {misplaced[0]} ... {args.command})"
+        )
+    command = COMMANDS[args.command]
+    script = importlib.import_module(command.module)
+    loaded = time.perf_counter()
+    sys.argv[0] = f"sporganized {args.command}"  # shown in the script's usage line
+
+    if command.needs_spotify and not NO_CLIENT_OPTIONS & set(rest):
+        # pylint: disable-next=import-outside-toplevel
+        from src.authenticate_spotify import authenticate_spotify
+
+        script.main(rest, authenticate_spotify(args.token_cache))
+    else:
+        script.main(rest)
+
+    if args.timings:
+        print(
+            f"sporganized {args.command}: start-up {loaded - start:.3f}s, "
+            f"total {time.perf_counter() - start:.3f}s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
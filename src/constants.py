@@ -1,52 +1,175 @@
 """
 Constants for Sporganized.
 
-Spotify Credentials:
+Spotify Credentials (loaded from `.env` when first used):
 - CLIENT_ID
 - CLIENT_SECRET
 - REDIRECT_URI
 - SCOPE
+- TOKEN_CACHE_PATH: where the OAuth token is cached (SPORGANIZED_TOKEN_CACHE)
 
-LastFM Credentials:
+LastFM Credentials (loaded from `.env` when first used):
 - LASTFM_API_KEY
 
+Only the credentials are read from `.env`, and only when first used. The
+settings below (SPORGANIZED_TOKEN_CACHE, SPORGANIZED_CACHE_DIR,
+SPORGANIZED_SHARED_CACHE, SPORGANIZED_LASTFM_RATE, SPORGANIZED_DISCOGS_RATE,
+SPORGANIZED_PROFILE, LASTFM_API_URL, DISCOG_API_URL) are read when this
+module is imported, so they must be set in the real environment; a warning
+is printed if `.env` defines any of them.
+
 API URLs:
 - DISCOG_API_URL: Discogs database search
 - LASTFM_API_URL: Last.fm API
 
 Settings:
-- RATE_DELAY: delay between API requests (seconds)
+- RATE_DELAY: initial delay between Spotify requests (seconds), adapted at runtime
+- SPOTIFY_MIN_RATE / SPOTIFY_MAX_RATE: bounds of the adaptive Spotify rate (requests/second)
+- SPOTIFY_MAX_RETRIES: retries of a throttled or failed Spotify call
 - N_CLUSTERS: number of K-means clusters
 - DESCRIPTION_TAG: marker for auto-generated playlists
 - PLAYLIST_PREFIX: prefix to sort playlists
+- PLAYLIST_BATCH_SIZE: max tracks per playlist add/remove call (Spotify limit)
+- WRITE_WORKERS: playlists written concurrently
+- ENRICH_WORKERS: threads used to enrich tracks with Last.fm/Discogs metadata
+- PAGE_WORKERS: pages of a Spotify listing (saved tracks, playlists, playlist
+  items) fetched concurrently once its total is known
+- PAGE_ATTEMPTS: tries of one listing page failing transiently (429, 5xx,
+  network) after the Spotify client's own retries, before the listing fails
+- LASTFM_RATE / DISCOGS_RATE: request budget of each provider (requests/second),
+  overridable with SPORGANIZED_LASTFM_RATE / SPORGANIZED_DISCOGS_RATE
+- BATCH_PROCESSES: accounts processed in parallel by the batch runner
+
+Cache:
+- CACHE_DIR: directory holding the local caches (SPORGANIZED_CACHE_DIR)
+- CACHE_DB: SQLite database backing the per-account caches (liked tracks, journal)
+- SHARED_CACHE_DB: database of the lookups shared between accounts (artist genres,
+  Last.fm/Discogs responses); CACHE_DB unless SPORGANIZED_SHARED_CACHE is set
+- CACHE_MEMORY_SIZE: max entries kept in each in-memory LRU
+- ARTIST_GENRE_TTL: lifetime of a cached artist → genres entry (seconds)
+- PROVIDER_CACHE_TTL: lifetime of a cached Last.fm/Discogs response (seconds)
+- PROVIDER_NEGATIVE_TTL: lifetime of a cached "nothing found" response
+  (empty result or 404), after which the lookup is retried (seconds)
+- PROVIDER_ERROR_TTL: lifetime of a cached transient failure (timeout, 5xx),
+  so a run does not hammer a failing provider (seconds)
+- PROVIDER_MAX_RETRIES: retries of a Last.fm/Discogs request answered with 429
+- LIBRARY_RECONCILE_INTERVAL: max age of the last full liked-tracks sync (seconds)
+- MOOD_MODEL_PATH: persisted mood centroids and tag vocabulary
+- LIBRARY_STORE_DIR: columnar export of the library for offline runs
+- ACCOUNTS_DIR: per-account cache directories used by the batch runner
+- WATCH_INTERVAL: seconds between two checks for new likes in watch mode
+- WATCH_PAGE_SIZE: liked tracks read by each watch-mode check
+- CHECKPOINT_INTERVAL: journal entries buffered between commits of a resumable run
+
+Mood model:
+- MINIBATCH_THRESHOLD: library size above which mini-batch K-means is used
+- MIN_TAG_TRACKS / MAX_TAG_FEATURES: tag vocabulary pruning
+- DISCOGS_GENRE_WEIGHT: feature weight of a Discogs genre (Last.fm tags weigh 0-1)
+- MOOD_TAG_HINTS: tags used to name each cluster after a mood
+
+Run reports:
+- REPORT_DIR: where each script writes its JSON run report
+- PROFILE: also profile runs with cProfile (SPORGANIZED_PROFILE=1)
 
 Mood labels for categorizing tracks: ("Chill", "Feel‑Good", "Dance", "Workout", "Mellow")
 """
 import os
-from dotenv import load_dotenv
-load_dotenv()
+import sys
+from typing import Optional
 
-# Spotify credentials
-CLIENT_ID: str | None = os.getenv("SPOTIPY_CLIENT_ID")
-CLIENT_SECRET: str | None = os.getenv("SPOTIPY_CLIENT_SECRET")
-REDIRECT_URI: str | None = os.getenv("SPOTIPY_REDIRECT_URI")
+# Spotify / LastFM credentials, read from the `.env` file on first access
+# (see `__getattr__`) so that commands which never call an API skip loading it
+_CREDENTIALS = {
+    "CLIENT_ID": "SPOTIPY_CLIENT_ID",
+    "CLIENT_SECRET": "SPOTIPY_CLIENT_SECRET",
+    "REDIRECT_URI": "SPOTIPY_REDIRECT_URI",
+    "LASTFM_API_KEY": "LASTFM_API_KEY",
+}
 SCOPE = (
     "user-library-read playlist-modify-public playlist-modify-private "
     "ugc-image-upload"
 )
+TOKEN_CACHE_PATH: str = os.getenv("SPORGANIZED_TOKEN_CACHE", ".cache")
+# Settings read at import time, from the environment only
+_ENV_SETTINGS = (
+    "SPORGANIZED_TOKEN_CACHE", "SPORGANIZED_CACHE_DIR", "SPORGANIZED_SHARED_CACHE",
+    "SPORGANIZED_LASTFM_RATE", "SPORGANIZED_DISCOGS_RATE", "SPORGANIZED_PROFILE",
+    "LASTFM_API_URL", "DISCOG_API_URL",
+)
 
-# LastFM API key
-LASTFM_API_KEY: str | None = os.getenv("LASTFM_API_KEY")
 
-# URLs
-DISCOG_API_URL="https://api.discogs.com/database/search"
-LASTFM_API_URL="http://ws.audioscrobbler.com/2.0"
+def __getattr__(name: str) -> Optional[str]:
+    if name not in _CREDENTIALS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+
+    unset = [setting for setting in _ENV_SETTINGS if setting not in os.environ]
+    load_dotenv()
+    ignored = [setting for setting in unset if setting in os.environ]
+    if ignored:
+        print(
+            f"Warning: ignored in .env (set in the environment instead): {', '.join(ignored)}",
+            file=sys.stderr,
+        )
+    value = os.getenv(_CREDENTIALS[name])
+    globals()[name] = value
+    return value
+
+# URLs (overridable, e.g. to point at the offline benchmark backend)
+DISCOG_API_URL = os.getenv("DISCOG_API_URL", "https://api.discogs.com/database/search")
+LASTFM_API_URL = os.getenv("LASTFM_API_URL", "http://ws.audioscrobbler.com/2.0")
 
 # Settings
-RATE_DELAY = 0.3                        # polite delay between API writes (seconds)
+RATE_DELAY = 0.3                        # starting delay between API calls (seconds)
+SPOTIFY_MIN_RATE = 0.5                  # never slower than one call every 2s
+SPOTIFY_MAX_RATE = 20.0                 # never faster than 20 calls/second
+SPOTIFY_MAX_RETRIES = 5                 # retries on 429 / 5xx / connection errors
 N_CLUSTERS = 5                          # number of clusters for the K-means
 DESCRIPTION_TAG = "[AUTO]"              # marker to identify auto‑generated lists
 PLAYLIST_PREFIX = "Playlist"            # helps the playlists sort together
+PLAYLIST_BATCH_SIZE = 100               # Spotify accepts up to 100 items per write
+WRITE_WORKERS = 4                       # concurrent playlist writers (shared rate budget)
+ENRICH_WORKERS = 8                      # concurrent metadata lookups
+PAGE_WORKERS = 4                        # concurrent page reads (shared rate budget)
+PAGE_ATTEMPTS = 2                       # only the failed page is fetched again
+LASTFM_RATE = float(os.getenv("SPORGANIZED_LASTFM_RATE", "5.0"))    # Last.fm allows ~5/s
+DISCOGS_RATE = float(os.getenv("SPORGANIZED_DISCOGS_RATE", "1.0"))  # Discogs allows 60/min
+PROVIDER_MAX_RETRIES = 3                # 429s are retried before anything is cached
+BATCH_PROCESSES = 4                     # accounts run in parallel, each with its own budget
+
+# Cache
+CACHE_DIR: str = os.getenv("SPORGANIZED_CACHE_DIR", ".sporganized")
+CACHE_DB: str = os.path.join(CACHE_DIR, "cache.sqlite3")
+SHARED_CACHE_DB: str = os.getenv("SPORGANIZED_SHARED_CACHE", CACHE_DB)
+CACHE_MEMORY_SIZE = 10_000              # entries kept in memory per cache
+ARTIST_GENRE_TTL = 30 * 24 * 3600       # artist genres rarely change: 30 days
+PROVIDER_CACHE_TTL = 30 * 24 * 3600     # so do Last.fm tags and Discogs genres
+PROVIDER_NEGATIVE_TTL = 7 * 24 * 3600   # tags may be added later: retry after a week
+PROVIDER_ERROR_TTL = 3600               # outages are usually short
+LIBRARY_RECONCILE_INTERVAL = 7 * 24 * 3600  # full re-sync (catches un-likes) weekly
+MOOD_MODEL_PATH: str = os.path.join(CACHE_DIR, "mood_model.npz")
+LIBRARY_STORE_DIR: str = os.path.join(CACHE_DIR, "library")
+ACCOUNTS_DIR: str = os.path.join(CACHE_DIR, "accounts")
+WATCH_INTERVAL = 30                     # one small request per check
+WATCH_PAGE_SIZE = 20                    # more new likes than this are paged in
+CHECKPOINT_INTERVAL = 200               # at most this much work is redone after a crash
+
+# Run reports
+REPORT_DIR: str = os.path.join(CACHE_DIR, "reports")
+PROFILE: bool = os.getenv("SPORGANIZED_PROFILE", "") not in ("", "0")
 
 # Moods labels used to sort liked tracks based on metadata
 MOOD_LABELS = ("Chill", "Feel‑Good", "Dance", "Workout", "Mellow")
+
+# Mood model
+MINIBATCH_THRESHOLD = 5_000             # switch to mini-batch K-means above this
+MIN_TAG_TRACKS = 2                      # ignore tags seen on a single track
+MAX_TAG_FEATURES = 2_000                # keep the most frequent tags only
+DISCOGS_GENRE_WEIGHT = 1.0              # same weight as a top Last.fm tag
+MOOD_TAG_HINTS = {
+    "Chill": ("chill", "chillout", "ambient", "lo-fi", "downtempo", "relaxing", "chillwave"),
+    "Feel‑Good": ("happy", "feel good", "upbeat", "summer", "fun", "pop", "funk", "soul"),
+    "Dance": ("dance", "electronic", "house", "disco", "edm", "club", "electro", "techno"),
+    "Workout": ("energetic", "rock", "metal", "hip-hop", "rap", "trap", "hardcore", "punk"),
+    "Mellow": ("mellow", "sad", "acoustic", "singer-songwriter", "folk", "melancholy", "jazz"),
+}
@@ -0,0 +1,33 @@
+"""
+database.py
+
+Opening of the SQLite databases holding the local caches.
+
+The caches, the liked-tracks snapshot and the run journal share database
+files, opened the same way: parent directories created, a 30s busy
+timeout, WAL journaling (readers never block the writer) and connections
+usable from worker threads, each store serializing its own access.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+
+
+def open_db(path: str, *schema: str) -> sqlite3.Connection:
+    """Connect to the database at `path` and create the tables of `schema`.
+
+    Args:
+        path: SQLite database file. Parent directories are created.
+        *schema: `CREATE TABLE IF NOT EXISTS` statements, run and committed.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in schema:
+        conn.execute(statement)
+    conn.commit()
+    return conn
@@ -0,0 +1,90 @@
+"""
+enrich_metadata.py
+
+Concurrent metadata enrichment stage for liked tracks.
+
+Tracks are looked up on a thread pool; throughput is bounded by each
+provider's token bucket rather than by serial request latency. Results are
+yielded in the same order as the input tracks. `cached_metadata` is the
+offline counterpart, reading the providers' response caches only.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.constants import ENRICH_WORKERS
+from src.track_record import TrackRecord
+from src.ttl_cache import TTLCache
+from src.metadata_providers import (
+    ProviderClient,
+    cached_discogs_genre,
+    cached_lastfm_tag_weights,
+    default_client,
+    get_lastfm_tag_weights,
+    get_discogs_genre,
+)
+
+TrackMetadata = Tuple[Dict[str, float], List[str]]  # (Last.fm tag weights, Discogs genres)
+
+
+def enrich_tracks(
+    tracks: Iterable[TrackRecord],
+    workers: int = ENRICH_WORKERS,
+    lastfm: Optional[ProviderClient] = None,
+    discogs: Optional[ProviderClient] = None,
+) -> Iterator[TrackMetadata]:
+    """Look up Last.fm tags and Discogs genres for every track concurrently.
+
+    Parameters
+    ----------
+    tracks : Iterable[TrackRecord]
+        Tracks to enrich (their primary artist name and title are looked up).
+    workers : int
+        Size of the thread pool.
+    lastfm, discogs : ProviderClient, optional
+        Provider clients; the shared default clients are used when omitted.
+
+    Yields
+    ------
+    tuple
+        `(tag_weights, genres)` for each track, in input order.
+    """
+    lastfm = lastfm or default_client("lastfm")
+    discogs = discogs or default_client("discogs")
+
+    def lookup(track: TrackRecord) -> TrackMetadata:
+        tags = get_lastfm_tag_weights(track.artist, track.name, lastfm)
+        genres = get_discogs_genre(track.artist, track.name, discogs)
+        return tags, genres
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(lookup, tracks)
+
+
+def cached_metadata(
+    tracks: Sequence[TrackRecord], lastfm: TTLCache, discogs: TTLCache
+) -> List[Optional[TrackMetadata]]:
+    """Return the cached Last.fm/Discogs results of every track, without any request.
+
+    Parameters
+    ----------
+    tracks : Sequence[TrackRecord]
+        Tracks to look up.
+    lastfm, discogs : TTLCache
+        The providers' response caches (see `open_provider_cache`).
+
+    Returns
+    -------
+    list
+        `(tag_weights, genres)` for each track, or None for tracks neither
+        provider has a result for (never asked, lookup failed, or expired).
+    """
+    metadata: List[Optional[TrackMetadata]] = []
+    for track in tracks:
+        tags = cached_lastfm_tag_weights(lastfm, track.artist, track.name)
+        genres = cached_discogs_genre(discogs, track.artist, track.name)
+        looked_up = tags is not None or genres is not None
+        metadata.append((tags or {}, genres or []) if looked_up else None)
+    return metadata
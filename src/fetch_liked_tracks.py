@@ -2,15 +2,74 @@
 spotify_fetch.py
 
 Helper for fetching saved (liked) tracks from Spotify using Spotipy.
-Can return either full track objects or simplified tracks with cleaned ISRCs.
+Can stream compact `TrackRecord`s, or return either full track objects or
+simplified tracks with cleaned ISRCs.
 """
 
-import re
-from typing import Dict, List, Any, Union
+from typing import Callable, Dict, Iterator, List, Any, Optional, Union
 from spotipy import Spotify
 
+from src.isrc_index import IsrcIndex
+from src.library_snapshot import LibrarySnapshot
+from src.paging import iter_pages
+from src.track_record import TrackRecord
+
+
+def iter_liked_tracks(
+    sp_client: Spotify, incremental: bool = False, isrc_index: Optional[IsrcIndex] = None
+) -> Iterator[TrackRecord]:
+    """
+    Stream the user's saved (liked) tracks as compact records.
+
+    Each page is projected to `TrackRecord`s as soon as it arrives and the
+    full Spotify objects are dropped, so downstream stages can consume the
+    library page by page with flat memory use. (The saved-tracks endpoint
+    has no `fields` filter, so the projection happens client-side.)
+
+    Parameters
+    ----------
+    sp_client : Spotify
+        Authenticated Spotipy client.
+    incremental : bool, default False
+        If True, sync the local library snapshot (only fetching tracks liked
+        since the last run, with a periodic full reconcile) and stream the
+        tracks from it instead of paging through the whole collection.
+    isrc_index : IsrcIndex, optional
+        Index to add every streamed record to, grouping duplicate recordings.
+
+    Yields
+    ------
+    TrackRecord
+        One record per saved track, newest first.
+    """
+    if isrc_index is not None:
+        yield from isrc_index.collect(iter_liked_tracks(sp_client, incremental))
+        return
+    if incremental:
+        snapshot = LibrarySnapshot()
+        try:
+            snapshot.sync(sp_client)
+            print(
+                f"Library sync: {snapshot.new_tracks} new track(s) "
+                f"in {snapshot.pages_fetched} page(s)."
+            )
+            yield from snapshot.tracks()
+        finally:
+            snapshot.close()
+        return
+
+    for results in iter_pages(_saved_tracks_page(sp_client), 50):
+        for item in results["items"]:
+            record = TrackRecord.from_item(item)
+            if record is not None:
+                yield record
+
+
 def fetch_liked_tracks(
-    sp_client: Spotify, simplified: bool = False
+    sp_client: Spotify,
+    simplified: bool = False,
+    incremental: bool = False,
+    isrc_index: Optional[IsrcIndex] = None,
 ) -> List[Union[Dict[str, Any], Dict[str, str]]]:
     """
     Fetch all saved (liked) tracks for the current user.
@@ -21,26 +80,38 @@ def fetch_liked_tracks(
         Authenticated Spotipy client.
     simplified : bool, default False
         If True, return a simplified dictionary for each track containing:
-        'id', 'name', and cleaned 'isrc'. If False, return full track objects.
+        'id', 'name', primary 'artist' name and cleaned 'isrc'. If False,
+        return full track objects.
+    incremental : bool, default False
+        Read simplified tracks through the local library snapshot (see
+        `iter_liked_tracks`). Only supported with `simplified=True`, since
+        the snapshot does not keep full track objects.
+    isrc_index : IsrcIndex, optional
+        Filled with the fetched tracks (simplified only), grouping the
+        copies of each recording.
 
     Returns
     -------
     List[dict]
         List of tracks, either full Spotify track objects or simplified dictionaries.
     """
-    tracks: List[Union[Dict[str, Any], Dict[str, str]]] = []
-    results = sp_client.current_user_saved_tracks(limit=50)
+    if simplified:
+        return [
+            record.simplified()
+            for record in iter_liked_tracks(sp_client, incremental, isrc_index)
+            if record.isrc
+        ]
+    if incremental or isrc_index is not None:
+        raise ValueError("incremental fetch and ISRC index only support simplified tracks")
 
-    while results:
+    tracks: List[Dict[str, Any]] = []
+    for results in iter_pages(_saved_tracks_page(sp_client), 50):
         for item in results["items"]:
-            t = item["track"]
-            if simplified:
-                isrc = t.get("external_ids", {}).get("isrc")
-                if isrc:
-                    cleaned_isrc = re.sub(r"[^A-Za-z0-9]", "", str(isrc)).upper()
-                    tracks.append({"id": t["id"], "name": t["name"], "isrc": cleaned_isrc})
-            else:
-                tracks.append(t)
-        results = sp_client.next(results) if results["next"] else None
+            tracks.append(item["track"])
 
     return tracks
+
+
+def _saved_tracks_page(sp_client: Spotify) -> Callable[[int], Dict[str, Any]]:
+    """Page reader of the saved tracks, 50 per page, for `iter_pages`."""
+    return lambda offset: sp_client.current_user_saved_tracks(limit=50, offset=offset)
@@ -0,0 +1,142 @@
+"""
+genre_classifier.py
+
+Precompiled classifier mapping Spotify artist genres to the broad groups of
+`GENRE_GROUPS`.
+
+- Exact genres are resolved with a single dict lookup. A genre listed in
+  several groups (e.g. "g-house") splits its weight between them instead of
+  silently going to whichever group comes first.
+- Unseen subgenres fall back to their longest known suffix, then to any known
+  token ("xyz rap" → "rap" → Hip Hop & Rap), with a reduced weight.
+- A track is scored over every genre of every artist (the primary artist
+  counting double) and goes to the best-scoring group.
+
+Resolutions are memoized per genre and per artist combination, so a whole
+library is classified in one pass where each distinct case is computed once.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from src.genre_groups import GENRE_GROUPS
+
+DEFAULT_GROUP = "Misc & Other"
+FALLBACK_WEIGHT = 0.5       # weight of a suffix/token match vs. an exact match
+PRIMARY_ARTIST_WEIGHT = 2.0  # the first credited artist counts double
+
+Scores = Tuple[Tuple[str, float], ...]
+
+
+class GenreClassifier:
+    """Compiled genre → group index.
+
+    Args:
+        groups: Mapping of group name to the genres it contains
+            (defaults to `GENRE_GROUPS`).
+        default: Group used when genres are present but none can be resolved.
+    """
+
+    def __init__(
+        self,
+        groups: Optional[Mapping[str, Sequence[str]]] = None,
+        default: str = DEFAULT_GROUP,
+    ) -> None:
+        groups = GENRE_GROUPS if groups is None else groups
+        self.default = default
+        self._order = {name: rank for rank, name in enumerate(groups)}
+
+        members: Dict[str, List[str]] = defaultdict(list)
+        for group_name, genres in groups.items():
+            for genre in genres:
+                key = genre.casefold()
+                if group_name not in members[key]:
+                    members[key].append(group_name)
+        self._exact: Dict[str, Scores] = {
+            genre: tuple((name, 1.0 / len(names)) for name in names)
+            for genre, names in members.items()
+        }
+        self._resolved: Dict[str, Scores] = {}
+
+    # ── Single genre ───────────────────────────────────────────────────────
+    def resolve(self, genre: str) -> Scores:
+        """Return the `(group, weight)` pairs a genre contributes (memoized)."""
+        key = genre.casefold().strip()
+        cached = self._resolved.get(key)
+        if cached is not None:
+            return cached
+
+        scores = self._exact.get(key)
+        if scores is None:
+            scores = self._fallback(key)
+        self._resolved[key] = scores
+        return scores
+
+    def _fallback(self, genre: str) -> Scores:
+        tokens = genre.split()
+        # Longest known suffix first: "dark melodic rap" → "melodic rap" → "rap"
+        for start in range(1, len(tokens)):
+            match = self._exact.get(" ".join(tokens[start:]))
+            if match:
+                return tuple((name, w * FALLBACK_WEIGHT) for name, w in match)
+        # Then any known token or hyphenated part, right-most first
+        parts = [p for token in reversed(tokens) for p in reversed(token.split("-"))]
+        for part in parts:
+            match = self._exact.get(part)
+            if match:
+                return tuple((name, w * FALLBACK_WEIGHT) for name, w in match)
+        return ()
+
+    def group_of(self, genre: str) -> str:
+        """Return the best group for a single genre, or the default group."""
+        return self.classify([[genre]]) or self.default
+
+    # ── Tracks ─────────────────────────────────────────────────────────────
+    def classify(self, artists_genres: Iterable[Iterable[str]]) -> Optional[str]:
+        """Return the group for a track given each credited artist's genres.
+
+        Returns None when no artist has any genre at all.
+        """
+        totals: Dict[str, float] = defaultdict(float)
+        has_genre = False
+        for position, genres in enumerate(artists_genres):
+            artist_weight = PRIMARY_ARTIST_WEIGHT if position == 0 else 1.0
+            for genre in genres:
+                has_genre = True
+                for group_name, weight in self.resolve(genre):
+                    totals[group_name] += weight * artist_weight
+        if not has_genre:
+            return None
+        if not totals:
+            return self.default
+        return min(totals, key=lambda name: (-totals[name], self._order.get(name, 0)))
+
+    def classify_library(
+        self,
+        tracks: Iterable[Tuple[str, Sequence[str]]],
+        artist_genres: Mapping[str, Sequence[str]],
+    ) -> Dict[str, List[str]]:
+        """Group a whole library in one pass.
+
+        Args:
+            tracks: `(track_id, artist_ids)` pairs.
+            artist_genres: Mapping from artist ID to its genres.
+
+        Returns:
+            Mapping from group name to the IDs of its tracks (tracks whose
+            artists have no genre are left out).
+        """
+        grouped: Dict[str, List[str]] = defaultdict(list)
+        by_artists: Dict[Tuple[str, ...], Optional[str]] = {}
+        for track_id, artist_ids in tracks:
+            key = tuple(artist_ids)
+            if key in by_artists:
+                group_name = by_artists[key]
+            else:
+                group_name = self.classify(artist_genres.get(aid, ()) for aid in key)
+                by_artists[key] = group_name
+            if group_name:
+                grouped[group_name].append(track_id)
+        return grouped
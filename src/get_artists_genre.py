@@ -1,44 +1,58 @@
-"""Fetch genres for Spotify artists with batching and rate-limit handling."""
+"""Fetch genres for Spotify artists with batching and caching.
+
+Rate limiting and 429 retries are handled by the client (see
+`src.rate_limited_spotify`).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src.constants import ARTIST_GENRE_TTL, SHARED_CACHE_DB
+from src.ttl_cache import TTLCache
+
+if TYPE_CHECKING:  # opening the cache alone must not import spotipy
+    import spotipy
+
+
+def open_artist_genre_cache() -> TTLCache:
+    """Return the persistent artist ID → genres cache (shared between accounts)."""
+    return TTLCache("artist_genres", ARTIST_GENRE_TTL, SHARED_CACHE_DB)
 
-import time
-from typing import Dict, List
-import spotipy
-from spotipy.exceptions import SpotifyException
-from src.constants import RATE_DELAY
 
 def get_artists_genre(
     sp_client: spotipy.Spotify,
     artist_ids: List[str],
+    cache: Optional[TTLCache] = None,
 ) -> Dict[str, List[str]]:
-    """Fetch genres for all artists, handling rate limits and batching.
+    """Fetch genres for all artists in batches of 50.
+
+    When a cache is given, only artists that are missing from it (or whose
+    entry expired) are requested from Spotify, and fresh results are stored.
 
     Args:
         sp_client: Authenticated Spotipy client.
         artist_ids: List of Spotify artist IDs.
+        cache: Optional persistent cache of artist genres.
 
     Returns:
         Mapping from artist ID to a list of genres.
     """
     artist_genres: Dict[str, List[str]] = {}
+    if cache is not None:
+        artist_genres.update(cache.get_many(artist_ids))
+        artist_ids = [aid for aid in artist_ids if aid not in artist_genres]
 
     for start in range(0, len(artist_ids), 50):
         batch = artist_ids[start:start + 50]
-
-        while True:
-            try:
-                artists_info = sp_client.artists(batch)["artists"]
-                break
-            except SpotifyException as exc:
-                if exc.http_status == 429:
-                    wait_time = int(exc.headers.get("Retry-After", 1))
-                    print(f"Rate-limited. Waiting {wait_time}s…")
-                    time.sleep(wait_time)
-                else:
-                    raise
-
-        for artist in artists_info:
-            artist_genres[artist["id"]] = artist.get("genres", [])
-
-        time.sleep(RATE_DELAY)
+        artists_info = sp_client.artists(batch)["artists"]
+
+        fetched = {
+            artist["id"]: artist.get("genres", [])
+            for artist in artists_info
+            if artist
+        }
+        artist_genres.update(fetched)
+        if cache is not None:
+            cache.set_many(fetched)
 
     return artist_genres
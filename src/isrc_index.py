@@ -0,0 +1,103 @@
+"""
+isrc_index.py
+
+Groups the liked tracks that are the same recording.
+
+One recording is often liked several times, from the album, a single and a
+compilation: each copy has its own Spotify track ID but they share an ISRC.
+The index groups tracks by cleaned ISRC (tracks without one stay alone)
+and elects a canonical track per group, the earliest liked (ties broken by
+ID), so the choice does not change when another copy is liked later.
+Metadata is looked up once per group and playlists only receive canonical
+track IDs.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from src.constants import PLAYLIST_BATCH_SIZE
+from src.track_record import TrackRecord
+
+
+def saved_write_calls(before: int, after: int) -> int:
+    """Playlist write calls saved by writing `after` tracks instead of `before` in full."""
+    return math.ceil(before / PLAYLIST_BATCH_SIZE) - math.ceil(after / PLAYLIST_BATCH_SIZE)
+
+
+class IsrcIndex:
+    """Index of liked tracks by recording (ISRC), with a canonical track each.
+
+    Feed it while fetching (`collect`), or with `add`.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[str, List[TrackRecord]] = {}
+        self._group_of: Dict[str, str] = {}  # track ID → group key
+        self.tracks = 0
+
+    # ── Building ───────────────────────────────────────────────────────────
+    def add(self, record: TrackRecord) -> None:
+        """Add a track to the group of its recording."""
+        if record.id in self._group_of:
+            return
+        key = record.isrc or f"id:{record.id}"
+        self._groups.setdefault(key, []).append(record)
+        self._group_of[record.id] = key
+        self.tracks += 1
+
+    def collect(self, records: Iterable[TrackRecord]) -> Iterator[TrackRecord]:
+        """Yield `records` unchanged, adding each one to the index on the way."""
+        for record in records:
+            self.add(record)
+            yield record
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        """Number of distinct recordings."""
+        return len(self._groups)
+
+    @property
+    def duplicates(self) -> int:
+        """Number of tracks that repeat an earlier-liked recording."""
+        return self.tracks - len(self._groups)
+
+    def __contains__(self, record: TrackRecord) -> bool:
+        """True if the recording of `record` is already indexed (as any copy)."""
+        return (record.isrc or f"id:{record.id}") in self._groups
+
+    @staticmethod
+    def _elect(group: List[TrackRecord]) -> TrackRecord:
+        return min(group, key=lambda t: (t.added_at, t.id))
+
+    def canonical(self, track_id: str) -> str:
+        """Canonical track ID of the recording of `track_id` (itself if unknown)."""
+        key = self._group_of.get(track_id)
+        return self._elect(self._groups[key]).id if key else track_id
+
+    def group_size(self, track_id: str) -> int:
+        """Number of liked copies of the recording of `track_id`."""
+        key = self._group_of.get(track_id)
+        return len(self._groups[key]) if key else 1
+
+    def representatives(self) -> List[TrackRecord]:
+        """The canonical track of every recording, in the order groups were first seen."""
+        return [self._elect(group) for group in self._groups.values()]
+
+    def savings(self, playlists: Iterable[List[str]]) -> Tuple[int, int]:
+        """Playlist entries and write calls saved by writing canonical tracks only.
+
+        `playlists` hold canonical track IDs; each stands for every liked copy
+        of its recording.
+        """
+        entries = calls = 0
+        for track_ids in playlists:
+            copies = sum(self.group_size(track_id) for track_id in track_ids)
+            entries += copies - len(track_ids)
+            calls += saved_write_calls(copies, len(track_ids))
+        return entries, calls
+
+    def dedupe(self, track_ids: Iterable[str]) -> List[str]:
+        """Replace IDs by their canonical ID and drop repeats, keeping first-seen order."""
+        return list(dict.fromkeys(self.canonical(track_id) for track_id in track_ids))
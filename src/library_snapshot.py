@@ -0,0 +1,192 @@
+"""
+library_snapshot.py
+
+Local snapshot of the user's saved (liked) tracks, kept in SQLite next to
+the other caches, to allow incremental syncs.
+
+Spotify returns saved tracks newest-first, so an incremental sync only pages
+until it reaches a track that is already known (at or before the stored
+`added_at` watermark). Un-likes cannot be seen that way, so a full reconcile
+rebuilds the snapshot every `LIBRARY_RECONCILE_INTERVAL` seconds; being a
+read of the whole library, it fetches its pages concurrently.
+
+Only the projected `TrackRecord` fields are stored.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set
+
+from src.constants import CACHE_DB, LIBRARY_RECONCILE_INTERVAL
+from src.database import open_db
+from src.track_record import TrackRecord
+
+if TYPE_CHECKING:  # spotipy is only needed to sync, not to read the snapshot
+    from spotipy import Spotify
+
+
+class LibrarySnapshot:
+    """SQLite-backed copy of the liked tracks with an `added_at` watermark.
+
+    Args:
+        path: SQLite database file. Parent directories are created.
+    """
+
+    def __init__(self, path: str = CACHE_DB) -> None:
+        self._conn = open_db(
+            path,
+            "CREATE TABLE IF NOT EXISTS saved_tracks ("
+            " id TEXT PRIMARY KEY, added_at TEXT NOT NULL, name TEXT NOT NULL,"
+            " isrc TEXT NOT NULL, artist_ids TEXT NOT NULL, artist TEXT NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS library_meta (key TEXT PRIMARY KEY, value TEXT)",
+        )
+        self.pages_fetched = 0
+        self.new_tracks = 0
+        self.new_records: List[TrackRecord] = []
+
+    # ── Metadata ───────────────────────────────────────────────────────────
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM library_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO library_meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """Newest `added_at` timestamp seen so far (ISO 8601), if any."""
+        return self._get_meta("watermark")
+
+    @property
+    def last_full_sync(self) -> Optional[float]:
+        """Time (epoch seconds) of the last full reconcile, if any."""
+        value = self._get_meta("last_full_sync")
+        return float(value) if value is not None else None
+
+    def needs_reconcile(self) -> bool:
+        """True if the snapshot is empty or its last full sync is too old."""
+        last_full = self.last_full_sync
+        if last_full is None or len(self) == 0:
+            return True
+        return time.time() - last_full > LIBRARY_RECONCILE_INTERVAL
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM saved_tracks").fetchone()[0]
+
+    # ── Sync ───────────────────────────────────────────────────────────────
+    def sync(
+        self,
+        sp_client: Spotify,
+        full: bool = False,
+        reconcile: bool = True,
+        page_size: int = 50,
+    ) -> None:
+        """Bring the snapshot up to date with the user's saved tracks.
+
+        Pages are projected and written as they arrive, so memory use does
+        not grow with the size of the library. A full sync fetches them
+        concurrently (see `src.paging`). A sync that fails is rolled back
+        entirely. After an incremental sync, the tracks it added are in
+        `new_records` (newest first).
+
+        Args:
+            sp_client: Authenticated Spotipy client.
+            full: Force a full reconcile (also detects un-liked tracks).
+            reconcile: Run the full reconcile when it is due; if False, only
+                new likes are fetched unless `full` is set.
+            page_size: Saved tracks per request (at most 50). With no new
+                likes, an incremental sync is a single request of this size.
+        """
+        self.pages_fetched = 0
+        self.new_tracks = 0
+        self.new_records = []
+        full = full or (reconcile and self.needs_reconcile())
+        watermark = None if full else self.watermark
+        known: Set[str] = set() if full else self._known_ids()
+        newest = watermark or ""
+
+        try:
+            if full:
+                self._conn.execute("DELETE FROM saved_tracks")
+
+            for results in self._pages(sp_client, full, page_size):
+                self.pages_fetched += 1
+                rows: List[tuple] = []
+                reached_known = False
+                for item in results["items"]:
+                    record = TrackRecord.from_item(item)
+                    if record is None:
+                        continue
+                    if watermark and (
+                        record.added_at < watermark
+                        or (record.added_at == watermark and record.id in known)
+                    ):
+                        reached_known = True
+                        break
+                    if record.id not in known:
+                        self.new_tracks += 1
+                        if not full:
+                            self.new_records.append(record)
+                    newest = max(newest, record.added_at)
+                    rows.append((
+                        record.id, record.added_at, record.name, record.isrc,
+                        ",".join(record.artist_ids), record.artist,
+                    ))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO saved_tracks "
+                    "(id, added_at, name, isrc, artist_ids, artist) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if reached_known:
+                    break
+
+            if full:
+                self._set_meta("last_full_sync", str(time.time()))
+            if newest:
+                self._set_meta("watermark", newest)
+            self._conn.commit()
+        except BaseException:
+            # Nothing of a failed sync is kept, so the tracks of the pages
+            # already read are fetched, and reported new, again next time
+            self._conn.rollback()
+            self.new_records = []
+            raise
+
+    @staticmethod
+    def _pages(sp_client: Spotify, full: bool, page_size: int) -> Iterator[Dict[str, Any]]:
+        """Saved-track pages: all of them concurrently, or one by one until stopped."""
+        # Imported here: reading the snapshot does not need spotipy
+        # pylint: disable-next=import-outside-toplevel
+        from src.paging import follow_pages, iter_pages
+
+        if full:
+            return iter_pages(
+                lambda offset: sp_client.current_user_saved_tracks(limit=page_size, offset=offset),
+                page_size,
+            )
+        return follow_pages(sp_client, sp_client.current_user_saved_tracks(limit=page_size))
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+    def _known_ids(self) -> Set[str]:
+        return {row[0] for row in self._conn.execute("SELECT id FROM saved_tracks")}
+
+    def tracks(self) -> Iterator[TrackRecord]:
+        """Yield the stored tracks as `TrackRecord`s, newest first."""
+        rows = self._conn.execute(
+            "SELECT id, name, isrc, artist_ids, artist, added_at FROM saved_tracks "
+            "ORDER BY added_at DESC, id"
+        )
+        for track_id, name, isrc, artist_ids, artist, added_at in rows:
+            yield TrackRecord(
+                track_id, name, isrc, tuple(filter(None, artist_ids.split(","))),
+                artist, added_at,
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,341 @@
+"""
+library_store.py
+
+Columnar export of the local library, for offline runs and statistics.
+
+`export_library` gathers the liked-tracks snapshot, the cached artist
+genres, the cached Last.fm/Discogs results and the computed labels (genre
+group, mood) into one directory of `.npy` arrays, without calling any API.
+`LibraryStore` memory-maps them back: opening a store reads no data, and
+decoding a column is a few vectorized slices, whatever the library size.
+
+Layout (every array is a `<name>.npy` file):
+    string tables   <name>.data (UTF-8 bytes, uint8) + <name>.offsets (int64)
+    list columns    <name>.offsets (int64, one more than rows) + <name>.values
+    tracks          track_id, name, isrc, artist (string tables),
+                    added_at (datetime64[s]), track_artists (→ artist_id),
+                    lastfm_tags (→ tag, with lastfm_tags.weights),
+                    discogs_genres (→ tag), enriched (bool: looked up),
+                    genre_group / mood (int16 → <label>.names, -1 for none)
+    artists         artist_id (string table), artist_genres (→ genre)
+    meta.json       format version, export time and row counts
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.constants import LIBRARY_STORE_DIR
+from src.genre_classifier import GenreClassifier
+from src.get_artists_genre import open_artist_genre_cache
+from src.library_snapshot import LibrarySnapshot
+from src.track_record import TrackRecord
+
+if TYPE_CHECKING:  # reading a store must not import the HTTP clients
+    from src.enrich_metadata import TrackMetadata
+
+STORE_FORMAT = 1
+NO_LABEL = -1
+
+
+# ── Columns ────────────────────────────────────────────────────────────────
+def _load(path: str, name: str) -> np.ndarray:
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+
+class StringColumn:
+    """Memory-mapped table of strings, stored as one UTF-8 blob and offsets."""
+
+    def __init__(self, path: str, name: str) -> None:
+        self.data = _load(path, f"{name}.data")
+        self.offsets = _load(path, f"{name}.offsets")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self) -> List[str]:
+        """Decode every string."""
+        blob = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+
+class ListColumn:
+    """Memory-mapped column holding a variable-length list per row."""
+
+    def __init__(self, path: str, name: str) -> None:
+        self.offsets = _load(path, f"{name}.offsets")
+        self.values = _load(path, f"{name}.values")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def rows(self, table: Optional[Sequence] = None) -> List[list]:
+        """Every row as a list, its values mapped through `table` when given."""
+        values = self.values.tolist()
+        if table is not None:
+            values = [table[value] for value in values]
+        offsets = self.offsets.tolist()
+        return [values[a:b] for a, b in zip(offsets, offsets[1:])]
+
+
+# ── Reading ────────────────────────────────────────────────────────────────
+class LibraryStore:  # pylint: disable=too-many-instance-attributes
+    """Read-only, memory-mapped view of an exported library.
+
+    Args:
+        path: Store directory written by `export_library`.
+
+    Raises:
+        FileNotFoundError: If no store was exported to `path`.
+        ValueError: If the store was written in an older format.
+    """
+
+    def __init__(self, path: str = LIBRARY_STORE_DIR) -> None:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"{path}: outdated library store, run `sporganized export` again")
+        self.path = path
+
+        self.track_id = StringColumn(path, "track_id")
+        self.name = StringColumn(path, "name")
+        self.isrc = StringColumn(path, "isrc")
+        self.artist = StringColumn(path, "artist")
+        self.added_at = _load(path, "added_at")
+        self.track_artists = ListColumn(path, "track_artists")
+        self.lastfm_tags = ListColumn(path, "lastfm_tags")
+        self.lastfm_weights = _load(path, "lastfm_tags.weights")
+        self.discogs_genres = ListColumn(path, "discogs_genres")
+        self.enriched = _load(path, "enriched")
+
+        self.artist_id = StringColumn(path, "artist_id")
+        self.artist_genres = ListColumn(path, "artist_genres")
+        self.genre = StringColumn(path, "genre")
+        self.tag = StringColumn(path, "tag")
+
+    @staticmethod
+    def exists(path: str = LIBRARY_STORE_DIR) -> bool:
+        """True if a store was exported to `path`."""
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+    @property
+    def exported_at(self) -> float:
+        """Time (epoch seconds) of the export."""
+        return self.meta["exported_at"]
+
+    def __len__(self) -> int:
+        return len(self.track_id)
+
+    def tracks(self) -> List[TrackRecord]:
+        """Return the stored tracks as `TrackRecord`s, newest first."""
+        added_at = [
+            "" if stamp == "NaT" else f"{stamp}Z"
+            for stamp in np.datetime_as_string(self.added_at, unit="s").tolist()
+        ]
+        columns = zip(
+            self.track_id.tolist(), self.name.tolist(), self.isrc.tolist(),
+            self.track_artists.rows(self.artist_id.tolist()), self.artist.tolist(), added_at,
+        )
+        return [
+            TrackRecord(track_id, name, isrc, tuple(artist_ids), artist, added)
+            for track_id, name, isrc, artist_ids, artist, added in columns
+        ]
+
+    def artist_genre_map(self) -> Dict[str, List[str]]:
+        """Return the cached genres of every artist, by artist ID."""
+        return dict(zip(self.artist_id.tolist(), self.artist_genres.rows(self.genre.tolist())))
+
+    def provider_metadata(self) -> List[Optional[TrackMetadata]]:
+        """Return each track's `(Last.fm tag weights, Discogs genres)`.
+
+        None for tracks that had not been looked up when the store was exported.
+        """
+        tags = self.tag.tolist()
+        weights = self.lastfm_weights.tolist()
+        offsets = self.lastfm_tags.offsets.tolist()
+        tag_rows = self.lastfm_tags.rows(tags)
+        return [
+            (dict(zip(row, weights[offsets[i]:offsets[i + 1]])), genres) if looked_up else None
+            for i, (row, genres, looked_up) in enumerate(
+                zip(tag_rows, self.discogs_genres.rows(tags), self.enriched.tolist())
+            )
+        ]
+
+    def labels(self, name: str) -> Dict[str, List[str]]:
+        """Group track IDs by the label stored in column `name` ('genre_group' or 'mood')."""
+        names = StringColumn(self.path, f"{name}.names").tolist()
+        codes = _load(self.path, name)
+        track_ids = self.track_id.tolist()
+        grouped: Dict[str, List[str]] = {label: [] for label in names}
+        for track_id, code in zip(track_ids, codes.tolist()):
+            if code != NO_LABEL:
+                grouped[names[code]].append(track_id)
+        return grouped
+
+
+# ── Writing ────────────────────────────────────────────────────────────────
+def _save(path: str, name: str, array: np.ndarray) -> None:
+    np.save(os.path.join(path, f"{name}.npy"), array)
+
+
+def _code(codes: Dict[str, int], value: str) -> int:
+    """Code of `value` in `codes`, assigning the next one to new values."""
+    return codes.setdefault(value, len(codes))
+
+
+def _offsets(lengths: Iterable[int], count: int) -> np.ndarray:
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(lengths, dtype=np.int64, count=count), out=offsets[1:])
+    return offsets
+
+
+def _write_strings(path: str, name: str, strings: Sequence[str]) -> None:
+    encoded = [string.encode("utf-8") for string in strings]
+    _save(path, f"{name}.offsets", _offsets(map(len, encoded), len(encoded)))
+    _save(path, f"{name}.data", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def _write_lists(path: str, name: str, rows: Sequence[Sequence], dtype: type = np.int32) -> None:
+    offsets = _offsets(map(len, rows), len(rows))
+    _save(path, f"{name}.offsets", offsets)
+    _save(path, f"{name}.values",
+          np.fromiter(chain.from_iterable(rows), dtype=dtype, count=int(offsets[-1])))
+
+
+def _write_labels(path: str, name: str, labels: Sequence[Optional[str]]) -> None:
+    codes: Dict[str, int] = {}
+    column = [NO_LABEL if label is None else _code(codes, label) for label in labels]
+    _save(path, name, np.asarray(column, dtype=np.int16))
+    _write_strings(path, f"{name}.names", list(codes))
+
+
+def _write_tracks(path: str, tracks: Sequence[TrackRecord]) -> Dict[str, int]:
+    """Write the track columns; return the artist ID → code table they use."""
+    for column in ("track_id", "name", "isrc", "artist"):
+        attribute = "id" if column == "track_id" else column
+        _write_strings(path, column, [getattr(t, attribute) for t in tracks])
+    added_at = [t.added_at.rstrip("Z") or "NaT" for t in tracks]
+    _save(path, "added_at", np.asarray(added_at, dtype="datetime64[s]"))
+
+    artist_codes: Dict[str, int] = {}
+    _write_lists(path, "track_artists",
+                 [[_code(artist_codes, aid) for aid in t.artist_ids] for t in tracks])
+    return artist_codes
+
+
+def _write_artists(path: str, artist_ids: Sequence[str], genres: Dict[str, List[str]]) -> None:
+    genre_codes: Dict[str, int] = {}
+    _write_strings(path, "artist_id", artist_ids)
+    _write_lists(path, "artist_genres",
+                 [[_code(genre_codes, g) for g in genres.get(aid, [])] for aid in artist_ids])
+    _write_strings(path, "genre", list(genre_codes))
+
+
+def _write_metadata(path: str, metadata: Sequence[Optional[TrackMetadata]]) -> None:
+    tag_codes: Dict[str, int] = {}
+    looked_up = [meta or ({}, []) for meta in metadata]
+    _write_lists(path, "lastfm_tags",
+                 [[_code(tag_codes, tag) for tag in tags] for tags, _ in looked_up])
+    _save(path, "lastfm_tags.weights", np.fromiter(
+        chain.from_iterable(tags.values() for tags, _ in looked_up), dtype=np.float32
+    ))
+    _write_lists(path, "discogs_genres",
+                 [[_code(tag_codes, g) for g in genres] for _, genres in looked_up])
+    _write_strings(path, "tag", list(tag_codes))
+    _save(path, "enriched", np.asarray([meta is not None for meta in metadata], dtype=bool))
+
+
+def predict_moods(metadata: Sequence[Optional[TrackMetadata]]) -> List[Optional[str]]:
+    """Mood of each track under the saved mood model (all None without a model)."""
+    # pylint: disable-next=import-outside-toplevel
+    from src.mood_model import MoodModel, track_features
+
+    moods: List[Optional[str]] = [None] * len(metadata)
+    model = MoodModel.load()
+    if model is not None:
+        rows = [(i, track_features(*meta)) for i, meta in enumerate(metadata) if meta]
+        for (i, _), mood in zip(rows, model.predict([features for _, features in rows])):
+            moods[i] = mood
+    return moods
+
+
+def _swap_in(partial: str, path: str, meta: Dict[str, object]) -> None:
+    """Finish the store written to `partial` with `meta.json` and move it to `path`."""
+    with open(os.path.join(partial, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+
+    previous = f"{path}.previous"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, previous)
+    os.rename(partial, path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def export_library(path: str = LIBRARY_STORE_DIR) -> LibraryStore:
+    """Export the local caches to a columnar store at `path` and open it.
+
+    No API is called: the store holds what the last runs cached (run
+    `sporganized sync` first for the newest likes). Genre groups use the
+    current classifier, moods the saved mood model. The store is written
+    next to `path` and swapped in at the end, so readers never see a
+    partial export.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.enrich_metadata import cached_metadata
+    from src.metadata_providers import open_provider_cache
+    # pylint: enable=import-outside-toplevel
+
+    snapshot = LibrarySnapshot()
+    try:
+        tracks = list(snapshot.tracks())
+    finally:
+        snapshot.close()
+
+    partial = f"{path}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+
+    artist_ids = list(_write_tracks(partial, tracks))
+    genre_cache = open_artist_genre_cache()
+    try:
+        genres = genre_cache.get_many(artist_ids)
+    finally:
+        genre_cache.close()
+    _write_artists(partial, artist_ids, genres)
+
+    lastfm, discogs = open_provider_cache("lastfm"), open_provider_cache("discogs")
+    try:
+        metadata = cached_metadata(tracks, lastfm, discogs)
+    finally:
+        lastfm.close()
+        discogs.close()
+    _write_metadata(partial, metadata)
+
+    classifier = GenreClassifier()
+    _write_labels(partial, "genre_group", [
+        classifier.classify(genres.get(aid, ()) for aid in t.artist_ids) for t in tracks
+    ])
+    _write_labels(partial, "mood", predict_moods(metadata))
+    _swap_in(partial, path, {
+        "format": STORE_FORMAT,
+        "exported_at": time.time(),
+        "tracks": len(tracks),
+        "artists": len(artist_ids),
+    })
+    return LibraryStore(path)
@@ -0,0 +1,369 @@
+"""
+metadata_providers.py
+
+Last.fm and Discogs lookups used to enrich liked tracks.
+
+Each provider gets its own `ProviderClient`: a dedicated `requests.Session`
+(connection pool sized for the enrichment workers) and its own token bucket,
+so one slow or strict provider never eats into another's budget. Responses
+are kept in a persistent cache (in `SHARED_CACHE_DB`, so accounts run by the
+batch runner share them): hits are served without any request, empty
+results and 404s are cached for a shorter time, and transient failures
+(timeouts, 5xx) for shorter still. Errors caused by the request rather than
+the track (bad or revoked API key, other 4xx) are never cached, and 429s
+are retried, honoring `Retry-After`, before anything is cached. Concurrent
+identical requests are coalesced into one. Clients can report their calls
+and limiter waits to a `RunMetrics` collector. Lookups made without a
+client share one default client per provider, created on first use.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import constants
+from src.constants import (
+    LASTFM_API_URL,
+    LASTFM_RATE,
+    DISCOG_API_URL,
+    DISCOGS_RATE,
+    ENRICH_WORKERS,
+    PROVIDER_CACHE_TTL,
+    PROVIDER_ERROR_TTL,
+    PROVIDER_NEGATIVE_TTL,
+    PROVIDER_MAX_RETRIES,
+    SHARED_CACHE_DB,
+)
+from src.run_metrics import RunMetrics
+from src.token_bucket import TokenBucket
+from src.ttl_cache import TTLCache
+
+UNCACHED_PARAMS = frozenset({"api_key", "format"})  # do not change the response's content
+FAILURE_KEY = "_failure"  # marks a cached failed request
+LASTFM_TRANSIENT_ERRORS = frozenset({8, 11, 16, 29})  # backend, offline, temporary, rate limit
+LASTFM_NOT_FOUND = 6  # "invalid parameters": the track or artist is unknown
+BACKOFF_BASE = 1.0  # seconds, doubled on each retry when no Retry-After is given
+
+
+class ProviderClient:  # pylint: disable=too-many-instance-attributes
+    """HTTP client for one metadata provider with its own pool and rate budget.
+
+    Args:
+        name: Provider name, used in logs.
+        rate: Allowed requests per second.
+        pool_size: Maximum number of pooled connections.
+        cache: Persistent response cache (none if omitted).
+        ttl_for: Cache lifetime of a successful response body (None: do not
+            cache it); defaults to `PROVIDER_CACHE_TTL` for every body.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        name: str,
+        rate: float,
+        pool_size: int = ENRICH_WORKERS,
+        cache: Optional[TTLCache] = None,
+        ttl_for: Optional[Callable[[Dict[str, Any]], Optional[float]]] = None,
+    ) -> None:
+        self.name = name
+        self.cache = cache
+        self.ttl_for = ttl_for or (lambda body: PROVIDER_CACHE_TTL)
+        self.bucket = TokenBucket(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.metrics: Optional[RunMetrics] = None
+        self.sent = 0
+        self.coalesced = 0
+
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, metrics: RunMetrics) -> None:
+        """Report HTTP calls and limiter waits to `metrics`."""
+        metrics.attach(self.session, self.name)
+        self.metrics = metrics
+
+    def get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the JSON body of `GET url`, from the cache when possible.
+
+        A request already in flight for the same key is waited for rather
+        than sent again. Raises `requests.RequestException` when the request
+        failed, now or within the failure's cache lifetime.
+        """
+        key = cache_key(url, params)
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                pending.set_result(self._lookup(key, url, params))
+            except BaseException as exc:
+                pending.set_exception(exc)
+                raise
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+
+        entry = pending.result()
+        if FAILURE_KEY in entry:
+            raise requests.RequestException(f"{self.name}: {entry[FAILURE_KEY]}")
+        return entry
+
+    def close(self) -> None:
+        """Close the HTTP session and the response cache."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    # ── Internals ──────────────────────────────────────────────────────────
+    def _lookup(self, key: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the cached entry for `key`, or send the request and cache its outcome."""
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        entry, ttl = self._send(url, params)
+        if self.cache is not None and ttl is not None:
+            self.cache.set(key, entry, ttl)
+        return entry
+
+    def _send(self, url: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[float]]:
+        """Send the request, retrying 429s.
+
+        Returns the entry to cache and its lifetime (None: do not cache it).
+        """
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            if self.metrics is not None:
+                self.metrics.record_wait(self.name, waited)
+            self.sent += 1
+            try:
+                response = self.session.get(url, params=params, timeout=10)
+                if response.status_code == 429 and attempt < PROVIDER_MAX_RETRIES:
+                    self._back_off(response, attempt)
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+                entry = response.json()
+                return entry, self.ttl_for(entry)
+            except requests.HTTPError as exc:
+                status = exc.response.status_code
+                return {FAILURE_KEY: f"HTTP {status}"}, failure_ttl(status)
+            except (requests.RequestException, ValueError) as exc:
+                return {FAILURE_KEY: type(exc).__name__}, PROVIDER_ERROR_TTL
+
+    def _back_off(self, response: requests.Response, attempt: int) -> None:
+        """Sleep before retrying a throttled request, as long as `Retry-After` asks."""
+        try:
+            delay = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            delay = BACKOFF_BASE * 2 ** attempt
+        delay += random.uniform(0, delay / 2)  # jitter de-synchronizes the workers
+        if self.metrics is not None:
+            self.metrics.record_wait(self.name, delay, "backoff")
+        time.sleep(delay)
+
+
+def cache_key(url: str, params: Dict[str, Any]) -> str:
+    """Cache key of a request: its URL and sorted, content-relevant parameters."""
+    kept = sorted((k, str(v).casefold()) for k, v in params.items() if k not in UNCACHED_PARAMS)
+    return f"{url}?{urlencode(kept)}"
+
+
+def open_provider_cache(name: str) -> TTLCache:
+    """Return the persistent response cache of provider `name`."""
+    return TTLCache(f"http_{name}", PROVIDER_CACHE_TTL, SHARED_CACHE_DB)
+
+
+def failure_ttl(status: int) -> Optional[float]:
+    """Cache lifetime of an HTTP error: only 404s and server errors are cached.
+
+    Other 4xx (bad or revoked API key, 429 after its retries) depend on the
+    request rather than the track, and the cache key ignores the API key.
+    """
+    if status == 404:
+        return PROVIDER_NEGATIVE_TTL
+    return PROVIDER_ERROR_TTL if status >= 500 else None
+
+
+def lastfm_ttl(body: Dict[str, Any]) -> Optional[float]:
+    """Cache lifetime of a Last.fm response, which reports errors in the body.
+
+    Errors other than "not found" and transient ones (e.g. invalid or
+    suspended API key, 10 and 26) are not cached.
+    """
+    error = body.get("error")
+    if error == LASTFM_NOT_FOUND:
+        return PROVIDER_NEGATIVE_TTL
+    if error in LASTFM_TRANSIENT_ERRORS:
+        return PROVIDER_ERROR_TTL
+    if error is not None:
+        return None
+    return PROVIDER_CACHE_TTL if body.get("toptags", {}).get("tag") else PROVIDER_NEGATIVE_TTL
+
+
+def discogs_ttl(body: Dict[str, Any]) -> float:
+    """Cache lifetime of a Discogs search response."""
+    return PROVIDER_CACHE_TTL if body.get("results") else PROVIDER_NEGATIVE_TTL
+
+
+def lastfm_client() -> ProviderClient:
+    """Return a client configured for the Last.fm quota, with its response cache."""
+    return ProviderClient(
+        "lastfm", LASTFM_RATE, cache=open_provider_cache("lastfm"), ttl_for=lastfm_ttl
+    )
+
+
+def discogs_client() -> ProviderClient:
+    """Return a client configured for the Discogs quota, with its response cache."""
+    return ProviderClient(
+        "discogs", DISCOGS_RATE, cache=open_provider_cache("discogs"), ttl_for=discogs_ttl
+    )
+
+
+_CLIENT_FACTORIES: Dict[str, Callable[[], ProviderClient]] = {
+    "lastfm": lastfm_client,
+    "discogs": discogs_client,
+}
+_default_clients: Dict[str, ProviderClient] = {}
+_default_lock = threading.Lock()
+
+
+def default_client(name: str) -> ProviderClient:
+    """Return the process-wide client of provider `name`, created on first use.
+
+    Lookups called without a client use it, so they share one session,
+    response cache and rate budget instead of each opening their own.
+    """
+    with _default_lock:
+        client = _default_clients.get(name)
+        if client is None:
+            client = _default_clients[name] = _CLIENT_FACTORIES[name]()
+        return client
+
+
+# ── Last.fm lookup ─────────────────────────────────────────────────────────
+def get_lastfm_tag_weights(
+    artist: str,
+    track: str,
+    client: Optional[ProviderClient] = None,
+    artist_fallback: bool = True,
+) -> Dict[str, float]:
+    """Return the Last.fm top tags (count > 10) of a track with their weight.
+
+    Last.fm counts are relative (0-100, the top tag being 100); they are
+    scaled to 0-1 and tag names are lower-cased. When the track has no tags
+    (or its lookup fails), the artist's top tags are used instead; being
+    cached per artist, they are fetched once for all of the artist's tracks.
+    Returns {} on failure.
+    """
+    client = client or default_client("lastfm")
+    weights = _lastfm_top_tags(client, lastfm_params(artist, track))
+    if not weights and artist_fallback:
+        weights = _lastfm_top_tags(client, lastfm_params(artist))
+    return weights
+
+
+def lastfm_params(artist: str, track: Optional[str] = None) -> Dict[str, str]:
+    """Query of the top tags of a track, or of the artist when `track` is None."""
+    if track is None:
+        return {"method": "artist.gettoptags", "artist": artist}
+    return {"method": "track.gettoptags", "artist": artist, "track": track}
+
+
+def parse_lastfm_tags(body: Dict[str, Any]) -> Dict[str, float]:
+    """Return the weighted top tags (count > 10) of a `*.gettoptags` body, or {}."""
+    try:
+        tags = body.get("toptags", {}).get("tag", [])
+        return {
+            tag["name"].lower(): float(tag["count"]) / 100
+            for tag in tags
+            if float(tag.get("count", 0)) > 10
+        }
+    except (ValueError, KeyError, AttributeError, TypeError):
+        return {}
+
+
+def _lastfm_top_tags(client: ProviderClient, params: Dict[str, str]) -> Dict[str, float]:
+    """Send a `*.gettoptags` call and return its weighted tags, or {} on failure."""
+    params = {**params, "api_key": constants.LASTFM_API_KEY, "format": "json"}
+    try:
+        return parse_lastfm_tags(client.get_json(LASTFM_API_URL, params))
+    except requests.RequestException:
+        return {}
+
+
+def cached_lastfm_tag_weights(
+    cache: TTLCache, artist: str, track: str
+) -> Optional[Dict[str, float]]:
+    """Offline `get_lastfm_tag_weights`: read the response cache only.
+
+    Returns None when the track was never looked up, its lookup failed, or
+    its entry expired.
+    """
+    body = cache.get(cache_key(LASTFM_API_URL, lastfm_params(artist, track)))
+    if body is None or FAILURE_KEY in body:
+        return None
+    weights = parse_lastfm_tags(body)
+    if not weights:
+        weights = parse_lastfm_tags(
+            cache.get(cache_key(LASTFM_API_URL, lastfm_params(artist)), {})
+        )
+    return weights
+
+
+def get_lastfm_tags(
+    artist: str, track: str, client: Optional[ProviderClient] = None
+) -> List[str]:
+    """Return the Last.fm top tags (count > 10) of a track, or [] on failure."""
+    return list(get_lastfm_tag_weights(artist, track, client))
+
+
+# ── Discogs lookup ─────────────────────────────────────────────────────────
+def get_discogs_genre(
+    artist: str, track: str, client: Optional[ProviderClient] = None
+) -> List[str]:
+    """Return the Discogs genres of the best match for a track, or [] on failure."""
+    client = client or default_client("discogs")
+    try:
+        return parse_discogs_genres(
+            client.get_json(DISCOG_API_URL, {"artist": artist, "track": track})
+        )
+    except requests.RequestException:
+        return []
+
+
+def parse_discogs_genres(body: Dict[str, Any]) -> List[str]:
+    """Return the genres of the best match of a Discogs search body, or []."""
+    try:
+        results = body.get("results", [])
+        return results[0].get("genre", []) if results else []
+    except (KeyError, AttributeError, TypeError):
+        return []
+
+
+def cached_discogs_genre(cache: TTLCache, artist: str, track: str) -> Optional[List[str]]:
+    """Offline `get_discogs_genre`: read the response cache only.
+
+    Returns None when the track was never looked up, its lookup failed, or
+    its entry expired.
+    """
+    body = cache.get(cache_key(DISCOG_API_URL, {"artist": artist, "track": track}))
+    return None if body is None or FAILURE_KEY in body else parse_discogs_genres(body)
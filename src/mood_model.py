@@ -0,0 +1,214 @@
+"""
+mood_model.py
+
+Tag-based mood model for liked tracks.
+
+Features
+    Each track becomes a sparse row over a tag vocabulary: Last.fm tags
+    weighted by their (relative) count, Discogs genres with a fixed weight,
+    scaled by inverse document frequency and L2-normalized. The matrix is
+    built in one vectorized pass (scipy CSR).
+
+Clustering
+    K-means with `N_CLUSTERS` clusters; above `MINIBATCH_THRESHOLD` tracks
+    the mini-batch variant is used so memory and time stay bounded on large
+    libraries. Clusters are named after the mood whose hint tags
+    (`MOOD_TAG_HINTS`) weigh the most in their centroid.
+
+Persistence
+    Vocabulary, IDF weights, centroids and cluster → mood mapping are saved
+    to `MOOD_MODEL_PATH`, so later runs assign tracks to the nearest stored
+    centroid without refitting the whole library.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from src.constants import (
+    N_CLUSTERS,
+    MOOD_LABELS,
+    MOOD_TAG_HINTS,
+    MOOD_MODEL_PATH,
+    MINIBATCH_THRESHOLD,
+    MIN_TAG_TRACKS,
+    MAX_TAG_FEATURES,
+    DISCOGS_GENRE_WEIGHT,
+)
+
+TagWeights = Dict[str, float]
+
+
+def track_features(lastfm_tags: Mapping[str, float], discogs_genres: Iterable[str]) -> TagWeights:
+    """Merge Last.fm tag weights and Discogs genres into one tag → weight dict."""
+    features = dict(lastfm_tags)
+    for genre in discogs_genres:
+        key = genre.lower()
+        features[key] = max(features.get(key, 0.0), DISCOGS_GENRE_WEIGHT)
+    return features
+
+
+def build_vocabulary(rows: Sequence[TagWeights]) -> List[str]:
+    """Keep tags seen on at least `MIN_TAG_TRACKS` tracks, most frequent first."""
+    document_freq = Counter(tag for row in rows for tag in row)
+    kept = [tag for tag, freq in document_freq.most_common() if freq >= MIN_TAG_TRACKS]
+    return kept[:MAX_TAG_FEATURES]
+
+
+def vectorize(
+    rows: Sequence[TagWeights], vocabulary: Sequence[str], idf: Optional[np.ndarray] = None
+) -> sparse.csr_matrix:
+    """Build the (IDF-scaled, L2-normalized) sparse matrix of `rows` over `vocabulary`."""
+    column = {tag: idx for idx, tag in enumerate(vocabulary)}
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for row in rows:
+        for tag, weight in row.items():
+            idx = column.get(tag)
+            if idx is not None:
+                indices.append(idx)
+                data.append(weight)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices), np.asarray(indptr)),
+        shape=(len(rows), len(vocabulary)),
+    )
+    if idf is not None:
+        matrix = matrix @ sparse.diags(idf.astype(np.float32))
+    return normalize_rows(matrix)
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Scale every non-empty row of `matrix` to unit L2 norm."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+def inverse_document_frequency(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Smoothed IDF of each column, as in scikit-learn's TfidfTransformer."""
+    n_rows = matrix.shape[0]
+    document_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    return np.log((1 + n_rows) / (1 + document_freq)) + 1
+
+
+class MoodModel:
+    """Fitted vocabulary, IDF weights and centroids, each centroid tied to a mood."""
+
+    def __init__(
+        self,
+        vocabulary: Sequence[str],
+        idf: np.ndarray,
+        centroids: np.ndarray,
+        moods: Sequence[str],
+    ) -> None:
+        self.vocabulary = list(vocabulary)
+        self.idf = idf
+        self.centroids = centroids
+        self.moods = list(moods)
+
+    # ── Fitting ────────────────────────────────────────────────────────────
+    @classmethod
+    def fit(cls, rows: Sequence[TagWeights], n_clusters: int = N_CLUSTERS) -> "MoodModel":
+        """Fit the model on the feature dicts of a library.
+
+        scikit-learn is only imported here: assigning tracks to saved
+        centroids does not need it.
+
+        Raises:
+            ValueError: if no tag is shared by enough tracks to build features.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+
+        vocabulary = build_vocabulary(rows)
+        if not vocabulary:
+            raise ValueError("No tag is shared by enough tracks to cluster them")
+        raw = vectorize(rows, vocabulary)
+        # Rows without a vocabulary tag are all zeros: `predict` leaves them
+        # unassigned, so they must not pull the centroids towards the origin
+        tagged = np.flatnonzero(np.diff(raw.indptr) > 0)
+        raw = raw[tagged]
+        idf = inverse_document_frequency(raw)
+        matrix = vectorize([rows[idx] for idx in tagged], vocabulary, idf)
+
+        n_clusters = min(n_clusters, matrix.shape[0])
+        if matrix.shape[0] > MINIBATCH_THRESHOLD:
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_clusters, batch_size=1024, n_init=3, random_state=42
+            )
+        else:
+            kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
+        kmeans.fit(matrix)
+
+        centroids = np.asarray(kmeans.cluster_centers_, dtype=np.float32)
+        return cls(vocabulary, idf, centroids, cls._name_clusters(centroids, vocabulary))
+
+    @staticmethod
+    def _name_clusters(centroids: np.ndarray, vocabulary: Sequence[str]) -> List[str]:
+        """Greedily give each cluster the mood whose hint tags weigh most in it."""
+        column = {tag: idx for idx, tag in enumerate(vocabulary)}
+        scores = np.zeros((len(centroids), len(MOOD_LABELS)))
+        for m_idx, mood in enumerate(MOOD_LABELS):
+            cols = [column[tag] for tag in MOOD_TAG_HINTS.get(mood, ()) if tag in column]
+            if cols:
+                scores[:, m_idx] = centroids[:, cols].sum(axis=1)
+
+        names: List[Optional[str]] = [None] * len(centroids)
+        free_moods = set(range(len(MOOD_LABELS)))
+        # Strongest (cluster, mood) pairs first; ties keep MOOD_LABELS order
+        for flat in np.argsort(-scores, axis=None, kind="stable"):
+            c_idx, m_idx = divmod(int(flat), len(MOOD_LABELS))
+            if names[c_idx] is None and m_idx in free_moods:
+                names[c_idx] = MOOD_LABELS[m_idx]
+                free_moods.discard(m_idx)
+        return [name or MOOD_LABELS[idx % len(MOOD_LABELS)] for idx, name in enumerate(names)]
+
+    # ── Assignment ─────────────────────────────────────────────────────────
+    def predict(self, rows: Sequence[TagWeights]) -> List[Optional[str]]:
+        """Return the mood of each row (None for rows with no known tag)."""
+        if not rows:
+            return []
+        matrix = vectorize(rows, self.vocabulary, self.idf)
+        # Rows are unit-norm: the nearest centroid maximizes x·c - |c|²/2
+        scores = np.asarray(matrix @ self.centroids.T) - 0.5 * (self.centroids ** 2).sum(axis=1)
+        nearest = scores.argmax(axis=1)
+        has_tags = np.diff(matrix.indptr) > 0
+        return [
+            self.moods[int(idx)] if known else None
+            for idx, known in zip(nearest, has_tags)
+        ]
+
+    # ── Persistence ────────────────────────────────────────────────────────
+    def save(self, path: str = MOOD_MODEL_PATH) -> None:
+        """Write the model to a compressed `.npz` file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            vocabulary=np.asarray(self.vocabulary, dtype=str),
+            idf=self.idf,
+            centroids=self.centroids,
+            moods=np.asarray(self.moods, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str = MOOD_MODEL_PATH) -> Optional["MoodModel"]:
+        """Load a saved model, or return None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                list(map(str, data["vocabulary"])),
+                data["idf"],
+                data["centroids"],
+                list(map(str, data["moods"])),
+            )
@@ -0,0 +1,102 @@
+"""
+paging.py
+
+Reading of Spotify's offset-paged listings (saved tracks, playlists,
+playlist items).
+
+Following each page's `next` link makes a long listing one round trip after
+another. The first page reports the listing's `total`, so every other
+offset is known up front: `iter_pages` fetches them concurrently, all
+through the client's rate limiter, and yields the pages back in order. A
+page whose request failed transiently (429, 5xx, network error) even after
+the client's own retries is fetched again on its own, without restarting
+the listing; any other error fails the listing at once.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+import requests
+import spotipy
+from spotipy.exceptions import SpotifyException
+
+from src.constants import PAGE_ATTEMPTS, PAGE_WORKERS
+from src.rate_limited_spotify import RETRY_STATUSES
+
+Page = Dict[str, Any]
+
+
+def iter_pages(
+    fetch_page: Callable[[int], Page],
+    limit: int,
+    workers: int = PAGE_WORKERS,
+    attempts: int = PAGE_ATTEMPTS,
+) -> Iterator[Page]:
+    """Yield every page of an offset-paged listing, in order.
+
+    The first page is read alone; the remaining offsets are then fetched by
+    `workers` threads, a bounded number of pages ahead of the consumer, so
+    memory does not grow with the listing.
+
+    Args:
+        fetch_page: Returns the page starting at the given offset (the call
+            should go through a `RateLimitedSpotify` client).
+        limit: Items per page, as requested by `fetch_page`.
+        workers: Pages fetched concurrently.
+        attempts: Tries of each page before a transient error is raised.
+            They come on top of the retries `RateLimitedSpotify` makes
+            for every call.
+    """
+    first = _fetch(fetch_page, 0, attempts)
+    yield first
+    offsets = iter(range(limit, first.get("total") or 0, limit))
+
+    pool: Optional[ThreadPoolExecutor] = None
+    pending: Deque[Future] = deque()
+    try:
+        for offset in offsets:
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=workers)
+            pending.append(pool.submit(_fetch, fetch_page, offset, attempts))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:  # the consumer stopped early, or a page failed
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+def follow_pages(sp_client: spotipy.Spotify, first: Page) -> Iterator[Page]:
+    """Yield `first` and the pages after it, following `next` links one by one.
+
+    For reads that usually stop after the first page (incremental syncs).
+    """
+    page: Optional[Page] = first
+    while page:
+        yield page
+        page = sp_client.next(page) if page["next"] else None
+
+
+def _fetch(fetch_page: Callable[[int], Page], offset: int, attempts: int) -> Page:
+    """Fetch one page, up to `attempts` times in total on transient errors.
+
+    Runs after the client's own retries: a page is only fetched again once
+    `RateLimitedSpotify` has given up on a throttled or failed call.
+    Client errors (400, 401, 403, 404) are raised at once.
+    """
+    for attempt in range(attempts):
+        try:
+            return fetch_page(offset)
+        except SpotifyException as exc:
+            if exc.http_status not in RETRY_STATUSES or attempt == attempts - 1:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == attempts - 1:
+                raise
+    raise ValueError("attempts must be at least 1")
@@ -0,0 +1,105 @@
+"""
+playlist_index.py
+
+In-memory index of the playlists owned by the current user.
+
+The user's playlists are listed once per run; lookups by name or by
+`DESCRIPTION_TAG` are then served from memory, and the index is updated in
+place when playlists are created or deleted.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import spotipy
+
+from src.constants import DESCRIPTION_TAG
+from src.paging import iter_pages
+
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key for playlist names."""
+    return " ".join(name.casefold().split())
+
+
+class PlaylistIndex:
+    """Owned playlists keyed by normalized name and by description tag.
+
+    Args:
+        sp_client: Authenticated Spotipy client.
+        description_tag: Marker identifying auto-generated playlists.
+    """
+
+    def __init__(
+        self, sp_client: spotipy.Spotify, description_tag: str = DESCRIPTION_TAG
+    ) -> None:
+        self.sp_client = sp_client
+        self.description_tag = description_tag
+        self.user_id: str = sp_client.me()["id"]
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._tagged: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """(Re)build the index with a single pass over the user's playlists."""
+        self._by_name.clear()
+        self._tagged.clear()
+        pages = iter_pages(
+            lambda offset: self.sp_client.current_user_playlists(limit=50, offset=offset), 50
+        )
+        for page in pages:
+            for playlist in page["items"]:
+                if playlist and playlist["owner"]["id"] == self.user_id:
+                    self._add(playlist)
+
+    def _add(self, playlist: Dict[str, Any]) -> None:
+        # First listed wins, matching the order Spotify returns playlists in
+        self._by_name.setdefault(normalize_name(playlist["name"]), playlist)
+        if self.description_tag in (playlist.get("description") or ""):
+            self._tagged[playlist["id"]] = playlist
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the owned playlist called `name` (case-insensitive), if any."""
+        return self._by_name.get(normalize_name(name))
+
+    def tagged(self) -> List[Dict[str, Any]]:
+        """Return every owned playlist whose description contains the tag."""
+        return list(self._tagged.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    # ── Mutations ──────────────────────────────────────────────────────────
+    def create(self, name: str, description: str, public: bool = True) -> Dict[str, Any]:
+        """Create a playlist for the user and add it to the index."""
+        playlist = self.sp_client.user_playlist_create(
+            user=self.user_id, name=name, public=public, description=description
+        )
+        playlist.setdefault("name", name)
+        if not playlist.get("description"):
+            playlist["description"] = description
+        playlist.setdefault("owner", {"id": self.user_id})
+        self._add(playlist)
+        return playlist
+
+    def get_or_create(
+        self, name: str, description: str, public: bool = True
+    ) -> Tuple[str, bool]:
+        """Return `(playlist_id, created)` for the playlist called `name`."""
+        playlist = self.find(name)
+        if playlist:
+            return playlist["id"], False
+        return self.create(name, description, public)["id"], True
+
+    def delete(self, playlist_id: str) -> None:
+        """Unfollow (delete) an owned playlist and drop it from the index."""
+        self.sp_client.current_user_unfollow_playlist(playlist_id)
+        self.forget(playlist_id)
+
+    def forget(self, playlist_id: str) -> None:
+        """Drop a playlist from the index without calling Spotify."""
+        self._tagged.pop(playlist_id, None)
+        for key in [k for k, p in self._by_name.items() if p["id"] == playlist_id]:
+            del self._by_name[key]
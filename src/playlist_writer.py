@@ -0,0 +1,149 @@
+"""
+playlist_writer.py
+
+Concurrent scheduler for playlist writes.
+
+Jobs are keyed by playlist: jobs for different playlists run in parallel on
+a small worker pool, while jobs for the same playlist are applied strictly
+in submission order. All jobs share the rate budget of the Spotify client
+they use (see `src.rate_limited_spotify`), so total write time tends towards
+the API's allowed throughput instead of the sum of per-call latencies.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import spotipy
+
+from src.constants import WRITE_WORKERS
+from src.sync_playlist import PlaylistPlan, plan_playlist_sync
+
+Job = Tuple[Future, Callable[..., Any], tuple, dict]
+
+
+class PlaylistWriter:
+    """Run playlist write jobs concurrently, in order per playlist.
+
+    If a job fails, the jobs queued after it for the same playlist are not
+    run (their futures fail too), since later batches assume earlier ones
+    were applied. Use as a context manager: leaving the block waits for all
+    jobs and re-raises the first error.
+
+    Args:
+        workers: Number of playlists written concurrently.
+    """
+
+    def __init__(self, workers: int = WRITE_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._queues: Dict[str, Deque[Job]] = {}
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self, playlist_id: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Future:
+        """Queue `func(*args, **kwargs)` after the previous jobs of `playlist_id`."""
+        future: Future = Future()
+        with self._lock:
+            self._futures.append(future)
+            queue = self._queues.get(playlist_id)
+            if queue is not None:  # a worker is already draining this playlist
+                queue.append((future, func, args, kwargs))
+                return future
+            self._queues[playlist_id] = deque([(future, func, args, kwargs)])
+        self._pool.submit(self._drain, playlist_id)
+        return future
+
+    def append(
+        self, sp_client: spotipy.Spotify, playlist_id: str, track_ids: List[str]
+    ) -> List[Future]:
+        """Queue adding `track_ids` at the end of a playlist, without reading it first."""
+        plan = PlaylistPlan(sp_client, playlist_id, list(track_ids), [], None)
+        return [self.submit(playlist_id, batch) for batch in plan.batches()]
+
+    def sync(
+        self,
+        sp_client: spotipy.Spotify,
+        playlist_id: str,
+        track_ids: List[str],
+        existing: bool = True,
+        then: Optional[Callable[[PlaylistPlan], Any]] = None,
+    ) -> Future:
+        """Schedule a diff-based sync; the future resolves to its `PlaylistPlan`.
+
+        The playlist is read first, then each add/remove batch is queued as
+        its own job behind the read. `then(plan)`, if given, is queued after
+        the last batch, so it only runs once the whole sync is applied.
+        """
+        def plan_and_queue() -> PlaylistPlan:
+            plan = plan_playlist_sync(sp_client, playlist_id, track_ids, existing)
+            for batch in plan.batches():
+                self.submit(playlist_id, batch)
+            if then is not None:
+                self.submit(playlist_id, then, plan)
+            return plan
+
+        return self.submit(playlist_id, plan_and_queue)
+
+    def _drain(self, playlist_id: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[playlist_id]
+                if not queue:
+                    del self._queues[playlist_id]
+                    return
+                future, func, args, kwargs = queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                future.set_exception(exc)
+                self._abort(playlist_id, exc)
+
+    def _abort(self, playlist_id: str, cause: Exception) -> None:
+        with self._lock:
+            queue = self._queues[playlist_id]
+            skipped = list(queue)
+            queue.clear()
+        for future, *_ in skipped:
+            if future.set_running_or_notify_cancel():
+                error = RuntimeError(f"Skipped: an earlier write to {playlist_id} failed")
+                error.__cause__ = cause
+                future.set_exception(error)
+
+    def wait(self) -> None:
+        """Block until every submitted job (including queued batches) is done.
+
+        Raises:
+            Exception: the first error raised by a job, if any.
+        """
+        done = 0
+        while True:
+            with self._lock:
+                pending = self._futures[done:]
+                if not pending:
+                    break
+            wait(pending)
+            done += len(pending)
+        for future in self._futures:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def close(self) -> None:
+        """Wait for all jobs and shut the worker pool down."""
+        try:
+            self.wait()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "PlaylistWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,131 @@
+"""
+rate_limited_spotify.py
+
+Wrapper around a Spotipy client that routes every API call through one
+adaptive rate limiter and retry policy.
+
+- Calls wait on an `AdaptiveTokenBucket` that speeds up while calls succeed
+  and backs off on 429 / 5xx responses.
+- Throttled calls are retried with exponential backoff and jitter, honoring
+  the `Retry-After` header when Spotify sends one. Reads are also retried on
+  5xx responses and network errors; writes (playlist creation, track adds
+  and removals) are not, since Spotify may have applied one that timed out
+  and sending it again would duplicate it.
+- `throttled_seconds` reports the total time spent waiting on the limiter
+  or backing off; `instrument()` also reports each call and wait to a
+  `RunMetrics` collector.
+"""
+
+from __future__ import annotations
+
+import functools
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+import spotipy
+from spotipy.exceptions import SpotifyException
+
+from src.constants import (
+    RATE_DELAY,
+    SPOTIFY_MIN_RATE,
+    SPOTIFY_MAX_RATE,
+    SPOTIFY_MAX_RETRIES,
+)
+from src.run_metrics import RunMetrics
+from src.token_bucket import AdaptiveTokenBucket
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+READ_METHODS = frozenset({  # safe to send again; any other method only retries on 429
+    "me", "current_user", "current_user_saved_tracks", "current_user_playlists",
+    "playlist", "playlist_items", "artist", "artists", "track", "tracks", "next", "previous",
+})
+BACKOFF_BASE = 1.0  # seconds, doubled on each retry when no Retry-After is given
+
+
+class RateLimitedSpotify:
+    """Proxy for `spotipy.Spotify` adding adaptive rate limiting and retries.
+
+    Any public method of the wrapped client can be called on the proxy.
+
+    Args:
+        client: The Spotipy client to wrap.
+        bucket: Rate limiter to use (one is created from the constants if omitted).
+        max_retries: Retries per call before the error is raised.
+    """
+
+    def __init__(
+        self,
+        client: spotipy.Spotify,
+        bucket: Optional[AdaptiveTokenBucket] = None,
+        max_retries: int = SPOTIFY_MAX_RETRIES,
+    ) -> None:
+        self.client = client
+        self.bucket = bucket or AdaptiveTokenBucket(
+            1.0 / RATE_DELAY, SPOTIFY_MIN_RATE, SPOTIFY_MAX_RATE
+        )
+        self.max_retries = max_retries
+        self.retries = 0
+        self._backoff_seconds = 0.0
+        self._lock = threading.Lock()
+        self.metrics: Optional[RunMetrics] = None
+
+    def instrument(self, metrics: RunMetrics) -> None:
+        """Report HTTP calls, limiter waits and backoffs to `metrics`."""
+        metrics.attach(self.client._session, "spotify")  # pylint: disable=protected-access
+        self.metrics = metrics
+
+    @property
+    def throttled_seconds(self) -> float:
+        """Total seconds spent waiting for the limiter or backing off."""
+        return self.bucket.waited + self._backoff_seconds
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "client":  # not set yet (e.g. while unpickling)
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self.call(attr, *args, **kwargs)
+
+        return call
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `func` under the rate limiter, retrying throttled (and, for reads, failed) calls."""
+        attempt = 0
+        name = getattr(func, "__name__", "call")
+        source = f"spotify {name}"
+        statuses = RETRY_STATUSES if name in READ_METHODS else frozenset({429})
+        while True:
+            waited = self.bucket.acquire()
+            if self.metrics is not None:
+                self.metrics.record_wait(source, waited)
+            try:
+                result = func(*args, **kwargs)
+            except SpotifyException as exc:
+                if exc.http_status not in statuses or attempt >= self.max_retries:
+                    raise
+                self.bucket.on_throttle()
+                retry_after = (exc.headers or {}).get("Retry-After")
+                delay = float(retry_after) if retry_after else BACKOFF_BASE * 2 ** attempt
+            except (requests.ConnectionError, requests.Timeout):
+                if name not in READ_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = BACKOFF_BASE * 2 ** attempt
+            else:
+                self.bucket.on_success()
+                return result
+
+            delay += random.uniform(0, delay / 2)  # jitter de-synchronizes retries
+            with self._lock:
+                self.retries += 1
+                self._backoff_seconds += delay
+            if self.metrics is not None:
+                self.metrics.record_wait(source, delay, "backoff")
+            time.sleep(delay)
+            attempt += 1
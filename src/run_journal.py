@@ -0,0 +1,130 @@
+"""
+run_journal.py
+
+Checkpoint journal for long script runs, stored in the cache database.
+
+A run records its finished work as it goes (enriched tracks, computed
+labels, written playlists) as JSON entries keyed by kind and key. Entries
+are buffered and committed every `CHECKPOINT_INTERVAL` records, so a crash
+or interrupt loses at most one interval of work. A run started with
+`resume=True` reads them back and skips what is already done; a successful
+run clears its journal.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.constants import CACHE_DB, CHECKPOINT_INTERVAL
+from src.database import open_db
+
+
+class RunJournal:
+    """Append-only journal of the completed steps of one script's run.
+
+    Use as a context manager: pending entries are flushed on exit, also
+    when the run fails.
+
+    Args:
+        run: Name of the run (one journal per script).
+        resume: Keep the entries of the previous, unfinished run instead of
+            starting a new one.
+        path: SQLite database file. Parent directories are created.
+        interval: Number of records buffered between commits.
+    """
+
+    def __init__(
+        self,
+        run: str,
+        resume: bool = False,
+        path: str = CACHE_DB,
+        interval: int = CHECKPOINT_INTERVAL,
+    ) -> None:
+        self.run = run
+        self.interval = interval
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._lock = threading.Lock()
+
+        self._conn = open_db(
+            path,
+            "CREATE TABLE IF NOT EXISTS run_journal ("
+            " run TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " PRIMARY KEY (run, kind, key))",
+            "CREATE TABLE IF NOT EXISTS run_journal_meta ("
+            " run TEXT PRIMARY KEY, started_at REAL NOT NULL)",
+        )
+        if not resume:
+            self._clear()
+        self.resumed = self.started_at is not None  # an unfinished run was found
+        self._conn.execute(
+            "INSERT OR IGNORE INTO run_journal_meta (run, started_at) VALUES (?, ?)",
+            (run, time.time()),
+        )
+        self._conn.commit()
+
+    @property
+    def started_at(self) -> Optional[float]:
+        """Start time (epoch seconds) of the journaled run."""
+        row = self._conn.execute(
+            "SELECT started_at FROM run_journal_meta WHERE run = ?", (self.run,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # ── Reading ────────────────────────────────────────────────────────────
+    def load(self, kind: str) -> Dict[str, Any]:
+        """Return every journaled entry of `kind` as a key → value dict."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM run_journal WHERE run = ? AND kind = ?", (self.run, kind)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    # ── Writing ────────────────────────────────────────────────────────────
+    def record(self, kind: str, key: str, value: Any) -> None:
+        """Journal that `key` of `kind` is done, with its result `value`."""
+        with self._lock:
+            self._pending.append((self.run, kind, key, json.dumps(value)))
+            if len(self._pending) < self.interval:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Commit the buffered entries."""
+        with self._lock:
+            if not self._pending:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO run_journal (run, kind, key, value) VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+            self._conn.commit()
+            self._pending.clear()
+
+    def finish(self) -> None:
+        """Mark the run as complete: its journal is no longer needed."""
+        with self._lock:
+            self._pending.clear()
+            self._clear()
+            self._conn.commit()
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM run_journal WHERE run = ?", (self.run,))
+        self._conn.execute("DELETE FROM run_journal_meta WHERE run = ?", (self.run,))
+
+    def close(self) -> None:
+        """Flush pending entries and close the database connection."""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,235 @@
+"""
+run_metrics.py
+
+Per-endpoint and per-stage instrumentation of a script run.
+
+- HTTP calls are recorded by a `requests` response hook on the Spotify and
+  Last.fm/Discogs sessions: count, status codes, latency histogram and
+  bytes sent/received, per endpoint (IDs in paths are folded into `{id}`).
+- Time spent waiting on rate limiters or backing off after 429 / 5xx is
+  reported by the clients themselves (`record_wait`).
+- `stage(name)` times a pipeline stage; calls and waits made while it runs
+  (from any thread) are also attributed to it.
+- `count(name, amount)` adds to a free-form run counter (e.g. work saved by
+  deduplication).
+- `instrumented_run(script)` wraps a script: it writes the JSON report to
+  `REPORT_DIR` at the end and, when `PROFILE` is set, profiles the run with
+  cProfile.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from src.constants import PROFILE, REPORT_DIR
+
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_API_VERSION = re.compile(r"^.*/v1/")
+_ID_SEGMENT = re.compile(r"/(playlists|users|artists|albums|tracks)/[^/]+")
+
+
+def endpoint_name(provider: str, method: str, url: str) -> str:
+    """Name an HTTP call after its provider, method and ID-free path.
+
+    >>> endpoint_name("spotify", "GET", "https://api.spotify.com/v1/playlists/37i9/items?limit=100")
+    'spotify GET /playlists/{id}/items'
+    """
+    parsed = urlparse(url)
+    path = _API_VERSION.sub("/", parsed.path).rstrip("/")
+    path = _ID_SEGMENT.sub(r"/\1/{id}", path) or "/"
+    api_method = parse_qs(parsed.query).get("method")  # Last.fm routes on a parameter
+    if api_method:
+        path = f"{path}?method={api_method[0]}"
+    return f"{provider} {method} {path}"
+
+
+class _CallStats:
+    """Counters of one endpoint or stage."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses: Counter = Counter()
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds: float, sent: int, received: int, status: int) -> None:
+        """Record one call."""
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.statuses[status] += 1
+        millis = seconds * 1000
+        slot = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if millis <= bound), -1)
+        self.histogram[slot] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view."""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [
+            f">{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "calls": self.calls,
+            "seconds": round(self.seconds, 3),
+            "mean_ms": round(self.seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+            "latency_histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class RunMetrics:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe collector of HTTP calls, waits and stage timings for one run.
+
+    Args:
+        script: Name of the script, used in the report and its file name.
+    """
+
+    def __init__(self, script: str) -> None:
+        self.script = script
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._stage = "setup"
+        self._stage_seconds: Dict[str, float] = defaultdict(float)
+        self._endpoints: Dict[str, _CallStats] = defaultdict(_CallStats)
+        self._stages: Dict[str, _CallStats] = defaultdict(_CallStats)
+        self._waits: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._stage_waits: Dict[str, float] = defaultdict(float)
+        self._counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    # ── Wiring ─────────────────────────────────────────────────────────────
+    def attach(self, session: requests.Session, provider: str) -> None:
+        """Record every response received through `session` under `provider`."""
+        def on_response(response: requests.Response, *_args: Any, **_kwargs: Any) -> None:
+            start = time.perf_counter()
+            received = len(response.content)  # read the body now to time it too
+            seconds = response.elapsed.total_seconds() + time.perf_counter() - start
+            request = response.request
+            self.record_call(
+                endpoint_name(provider, request.method or "GET", request.url or ""),
+                seconds,
+                len(request.body or b""),
+                received,
+                response.status_code,
+            )
+
+        session.hooks["response"].append(on_response)
+
+    # ── Recording ──────────────────────────────────────────────────────────
+    def record_call(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, endpoint: str, seconds: float, sent: int, received: int, status: int
+    ) -> None:
+        """Record one HTTP call to `endpoint`."""
+        with self._lock:
+            self._endpoints[endpoint].add(seconds, sent, received, status)
+            self._stages[self._stage].add(seconds, sent, received, status)
+
+    def record_wait(self, source: str, seconds: float, kind: str = "rate_limit") -> None:
+        """Record time spent sleeping before a call (`kind`: rate_limit or backoff)."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._waits[source][kind] += seconds
+            self._stage_waits[self._stage] += seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add `amount` to the run counter `name`."""
+        with self._lock:
+            self._counters[name] += amount
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage and attribute the calls made meanwhile to it."""
+        with self._lock:
+            previous, self._stage = self._stage, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stage_seconds[name] += time.perf_counter() - start
+                self._stage = previous
+
+    # ── Reporting ──────────────────────────────────────────────────────────
+    def total_calls(self) -> int:
+        """Number of HTTP calls recorded so far, over every endpoint."""
+        with self._lock:
+            return sum(stats.calls for stats in self._endpoints.values())
+
+    def report(self) -> Dict[str, Any]:
+        """Return the whole run as a JSON-serializable dict."""
+        with self._lock:
+            stages = {
+                name: {
+                    "wall_seconds": round(self._stage_seconds.get(name, 0.0), 3),
+                    "wait_seconds": round(self._stage_waits.get(name, 0.0), 3),
+                    **self._stages[name].as_dict(),
+                }
+                for name in {**self._stage_seconds, **self._stages}
+            }
+            return {
+                "script": self.script,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_seconds": round(time.perf_counter() - self._start, 3),
+                "stages": stages,
+                "endpoints": {
+                    name: stats.as_dict() for name, stats in sorted(self._endpoints.items())
+                },
+                "waits": {
+                    source: {kind: round(sec, 3) for kind, sec in kinds.items()}
+                    for source, kinds in sorted(self._waits.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def write_report(self, directory: str = REPORT_DIR) -> str:
+        """Write the report as JSON under `directory` and return its path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(directory, f"{self.script}-{stamp}.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=2)
+        return path
+
+
+@contextlib.contextmanager
+def instrumented_run(script: str, profile: bool = PROFILE) -> Iterator[RunMetrics]:
+    """Collect metrics for a script run, then write its report (and profile).
+
+    The report is written even if the run fails, so a crash late in a long
+    run still says where the time went.
+    """
+    metrics = RunMetrics(script)
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        path = metrics.write_report()
+        print(f"Run report: {path}")
+        if profiler is not None:
+            profiler.disable()
+            profile_path = path.removesuffix(".json") + ".prof"
+            profiler.dump_stats(profile_path)
+            print(f"Profile: {profile_path}")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
@@ -0,0 +1,174 @@
+"""
+sync_playlist.py
+
+Bring a playlist's contents in line with a wanted list of track IDs using
+the minimal number of write calls.
+
+The current contents are read together with the playlist `snapshot_id`; if
+the snapshot changes while reading (someone edited the playlist), the read
+is retried. Removals are then issued against that snapshot so Spotify
+applies them to the version that was diffed.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+import spotipy
+
+from src.constants import PLAYLIST_BATCH_SIZE
+from src.paging import iter_pages
+
+
+class PlaylistChangedError(RuntimeError):
+    """Raised when a playlist keeps changing while its contents are read."""
+
+
+def get_playlist_track_ids(
+    sp_client: spotipy.Spotify, playlist_id: str, attempts: int = 3
+) -> Tuple[List[str], str]:
+    """Return the track IDs currently in a playlist and the matching snapshot ID.
+
+    Args:
+        sp_client: Authenticated Spotipy client.
+        playlist_id: Playlist to read.
+        attempts: How many times to re-read if the playlist changes mid-read.
+
+    Raises:
+        PlaylistChangedError: if no consistent read was obtained.
+    """
+    for _ in range(attempts):
+        snapshot_id = sp_client.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+        track_ids: List[str] = []
+        pages = iter_pages(
+            lambda offset: sp_client.playlist_items(
+                playlist_id,
+                fields="items(track(id)),next,total",
+                limit=100,
+                offset=offset,
+                additional_types=("track",),
+            ),
+            100,
+        )
+        for page in pages:
+            track_ids.extend(
+                item["track"]["id"]
+                for item in page["items"]
+                if item.get("track") and item["track"].get("id")
+            )
+
+        after = sp_client.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+        if after == snapshot_id:
+            return track_ids, snapshot_id
+
+    raise PlaylistChangedError(f"Playlist {playlist_id} changed during {attempts} reads")
+
+
+def diff_tracks(current: Iterable[str], wanted: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Return `(to_add, to_remove)`, keeping the order of `wanted` for additions."""
+    current_set: Set[str] = set(current)
+    wanted_list = list(dict.fromkeys(wanted))
+    wanted_set = set(wanted_list)
+    to_add = [tid for tid in wanted_list if tid not in current_set]
+    to_remove = [tid for tid in current_set if tid not in wanted_set]
+    return to_add, to_remove
+
+
+class PlaylistPlan:
+    """The write batches needed to bring one playlist up to date.
+
+    Removal batches come first and are chained on the playlist snapshot ID;
+    `batches()` returns them as zero-argument callables, in the order they
+    must be applied.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        sp_client: spotipy.Spotify,
+        playlist_id: str,
+        to_add: List[str],
+        to_remove: List[str],
+        snapshot_id: Optional[str],
+    ) -> None:
+        self.sp_client = sp_client
+        self.playlist_id = playlist_id
+        self.to_add = to_add
+        self.to_remove = to_remove
+        self.snapshot_id = snapshot_id
+
+    @property
+    def added(self) -> int:
+        """Number of tracks the plan adds."""
+        return len(self.to_add)
+
+    @property
+    def removed(self) -> int:
+        """Number of tracks the plan removes."""
+        return len(self.to_remove)
+
+    def batches(self) -> List[Callable[[], None]]:
+        """Return the write calls of the plan, in application order."""
+        size = PLAYLIST_BATCH_SIZE
+        removals = [
+            functools.partial(self._remove, self.to_remove[start:start + size])
+            for start in range(0, len(self.to_remove), size)
+        ]
+        additions = [
+            functools.partial(self._add, self.to_add[start:start + size])
+            for start in range(0, len(self.to_add), size)
+        ]
+        return removals + additions
+
+    def _remove(self, batch: List[str]) -> None:
+        self.snapshot_id = self.sp_client.playlist_remove_all_occurrences_of_items(
+            self.playlist_id, batch, snapshot_id=self.snapshot_id
+        )["snapshot_id"]
+
+    def _add(self, batch: List[str]) -> None:
+        self.sp_client.playlist_add_items(self.playlist_id, batch)
+
+
+def plan_playlist_sync(
+    sp_client: spotipy.Spotify,
+    playlist_id: str,
+    track_ids: List[str],
+    existing: bool = True,
+) -> PlaylistPlan:
+    """Read a playlist and compute the minimal writes to match `track_ids`.
+
+    Args:
+        sp_client: Authenticated Spotipy client.
+        playlist_id: Playlist to update.
+        track_ids: Wanted contents of the playlist.
+        existing: False for a freshly created (empty) playlist, skipping the read.
+    """
+    if existing:
+        current, snapshot_id = get_playlist_track_ids(sp_client, playlist_id)
+    else:
+        current, snapshot_id = [], None
+    to_add, to_remove = diff_tracks(current, track_ids)
+    return PlaylistPlan(sp_client, playlist_id, to_add, to_remove, snapshot_id)
+
+
+def sync_playlist(
+    sp_client: spotipy.Spotify,
+    playlist_id: str,
+    track_ids: List[str],
+    existing: bool = True,
+) -> Tuple[int, int]:
+    """Add and remove only what differs between the playlist and `track_ids`.
+
+    Args:
+        sp_client: Authenticated Spotipy client.
+        playlist_id: Playlist to update.
+        track_ids: Wanted contents of the playlist.
+        existing: False for a freshly created (empty) playlist, skipping the read.
+
+    Returns:
+        `(added, removed)` track counts.
+    """
+    plan = plan_playlist_sync(sp_client, playlist_id, track_ids, existing)
+    for batch in plan.batches():
+        batch()
+    return plan.added, plan.removed
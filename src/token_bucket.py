@@ -0,0 +1,89 @@
+"""
+token_bucket.py
+
+Thread-safe token bucket used to keep API calls within a provider's quota.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum number of stored tokens (defaults to `rate`, at least 1).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.waited = 0.0  # total seconds callers spent blocked in acquire()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available, consume them and return the wait time."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.waited += waited
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate adapts to the server's responses (AIMD).
+
+    The rate grows additively while calls succeed and is cut multiplicatively
+    when the server pushes back (429 / 5xx), staying within `[min_rate, max_rate]`.
+
+    Args:
+        rate: Initial tokens per second.
+        min_rate: Lower bound for the rate.
+        max_rate: Upper bound for the rate.
+        increase: Rate added after each successful call.
+        decrease: Factor applied to the rate on throttling.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        increase: float = 0.25,
+        decrease: float = 0.5,
+    ) -> None:
+        super().__init__(rate, capacity=max(1.0, rate))
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+
+    def on_success(self) -> None:
+        """Speed up a little after a successful call."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self.capacity = max(1.0, self.rate)
+
+    def on_throttle(self) -> None:
+        """Back off after the server signalled pressure, and drop stored tokens."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.capacity = max(1.0, self.rate)
+            self._tokens = 0.0
@@ -0,0 +1,74 @@
+"""
+track_record.py
+
+Compact, slotted representation of a liked track.
+
+Only the fields the pipeline uses are kept, so the full Spotify track object
+(album, images, markets, ...) can be dropped as soon as a page is projected.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+_ISRC_JUNK = re.compile(r"[^A-Za-z0-9]")
+
+
+def clean_isrc(isrc: Any) -> str:
+    """Normalize an ISRC: keep alphanumerics only, upper-cased ('' if missing)."""
+    return _ISRC_JUNK.sub("", str(isrc)).upper() if isrc else ""
+
+
+class TrackRecord:
+    """A liked track reduced to the fields Sporganized needs.
+
+    Attributes:
+        id: Spotify track ID.
+        name: Track title.
+        isrc: Cleaned ISRC, or '' when Spotify has none.
+        artist_ids: IDs of the credited artists, primary artist first.
+        artist: Name of the primary artist (used for metadata lookups).
+        added_at: When the track was liked (ISO 8601).
+    """
+
+    __slots__ = ("id", "name", "isrc", "artist_ids", "artist", "added_at")
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        id: str,  # pylint: disable=redefined-builtin
+        name: str,
+        isrc: str,
+        artist_ids: Tuple[str, ...],
+        artist: str,
+        added_at: str,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.isrc = isrc
+        self.artist_ids = artist_ids
+        self.artist = artist
+        self.added_at = added_at
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> Optional["TrackRecord"]:
+        """Project a saved-track item (`{"added_at", "track"}`); None for local/empty tracks."""
+        track = item.get("track")
+        if not track or not track.get("id"):
+            return None
+        artists = track.get("artists") or []
+        return cls(
+            id=track["id"],
+            name=track.get("name", ""),
+            isrc=clean_isrc((track.get("external_ids") or {}).get("isrc")),
+            artist_ids=tuple(a["id"] for a in artists if a.get("id")),
+            artist=artists[0].get("name", "") if artists else "",
+            added_at=item.get("added_at", ""),
+        )
+
+    def simplified(self) -> Dict[str, str]:
+        """Return the legacy simplified dict form."""
+        return {"id": self.id, "name": self.name, "artist": self.artist, "isrc": self.isrc}
+
+    def __repr__(self) -> str:
+        return f"TrackRecord(id={self.id!r}, name={self.name!r}, artist={self.artist!r})"
@@ -0,0 +1,150 @@
+"""
+ttl_cache.py
+
+Persistent key/value cache backed by SQLite, with per-entry expiry and a
+size-bounded in-memory LRU in front of the database.
+
+Entries are JSON-encoded and grouped by namespace so that several caches
+(artist genres, provider lookups, ...) can share one database file.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.constants import CACHE_DB, CACHE_MEMORY_SIZE
+from src.database import open_db
+
+_SQLITE_MAX_VARS = 500  # stay well below SQLite's host parameter limit
+
+
+class TTLCache:
+    """Namespaced SQLite cache with per-entry TTLs and an in-memory LRU.
+
+    Args:
+        namespace: Logical name of the cache inside the database.
+        ttl: Default lifetime of an entry, in seconds.
+        path: SQLite database file. Parent directories are created.
+        max_memory: Maximum number of entries kept in the in-memory LRU.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        path: str = CACHE_DB,
+        max_memory: int = CACHE_MEMORY_SIZE,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = open_db(
+            path,
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))",
+        )
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the live entries among `keys`; missing or expired keys are omitted."""
+        now = time.time()
+        found: Dict[str, Any] = {}
+        pending = []
+        requested = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for key in requested:
+                entry = self._memory.get(key)
+                if entry and entry[1] > now:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    self._memory.pop(key, None)
+                    pending.append(key)
+
+            for start in range(0, len(pending), _SQLITE_MAX_VARS):
+                chunk = pending[start:start + _SQLITE_MAX_VARS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT key, value, expires_at FROM cache "
+                    f"WHERE namespace = ? AND key IN ({placeholders}) AND expires_at > ?",
+                    (self.namespace, *chunk, now),
+                )
+                for key, raw, expires_at in rows:
+                    value = json.loads(raw)
+                    found[key] = value
+                    self._remember(key, value, expires_at)
+
+            self.hits += len(found)
+            self.misses += len(requested) - len(found)
+        return found
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the live value for `key`, or `default`."""
+        return self.get_many([key]).get(key, default)
+
+    # ── Writes ─────────────────────────────────────────────────────────────
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store every item of `items` with the given (or default) TTL."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        rows = [
+            (self.namespace, key, json.dumps(value), expires_at)
+            for key, value in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            for key, value in items.items():
+                self._remember(key, value, expires_at)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a single entry."""
+        self.set_many({key: value}, ttl)
+
+    def __len__(self) -> int:
+        """Number of live entries stored in this namespace."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time()),
+            ).fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Delete expired rows of this namespace and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    # ── Internals ──────────────────────────────────────────────────────────
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)